@@ -1,81 +1,402 @@
+import collections.abc
+import concurrent.futures
+import contextlib
+import dataclasses
+import functools
+import threading
+import types
+import uuid
+
 import arcpy
+import numpy as np
+import pandas as pd
+
+SQL_IN_CHUNK_SIZE = 999          # maximum number of values in one SQL IN (...) list
+MAX_PUSHDOWN_KEYS = 20000        # above this many destination keys a full source scan is cheaper than chunked IN queries
+EDIT_CHECKPOINT_ROWS = 10000     # rows written per edit operation before it is closed and a new one started
+OVERHEAD_TYPES = frozenset(["Въздушна линия ВН", "Въздушна линия СрН", "Въздушна линия НН", "Въздушна изолирана линия СрН", "Въздушна изолирана линия НН"])
+UNDERGROUND_TYPES = frozenset(["Кабелна линия ВН", "Кабелна линия СрН", "Кабелна линия НН", "Земно въже ВН", "Земно въже СрН"])
+OVERHEAD_BIT, UNDERGROUND_BIT, OTHER_SUBTYPE_BIT = 1, 2, 4
+SUBTYPE_BITS = {**dict.fromkeys(OVERHEAD_TYPES, OVERHEAD_BIT), **dict.fromkeys(UNDERGROUND_TYPES, UNDERGROUND_BIT)}
+
+GDB = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb"
+# FC.<feature class name> is the full path of the feature class in GDB, so every task refers to a class by the same string.
+FC = types.SimpleNamespace(**{name: f"{GDB}\\{name}" for name in [
+    "Bay", "BayScheme", "Busbar", "CircuitBreaker", "CircuitSource", "CircuitSourceID", "Conductor", "Disconnector",
+    "Electric_Net_Junctions", "FaultIndicator", "Fuse", "InternalConnection", "LoadBreakSwitch", "MeasurementTransformer",
+    "Station", "StationBoundary", "StationEquipment", "StationScheme", "SwitchingFacility", "Transformer", "TransformerUnit"]})
+
+arcpy.env.overwriteOutput = True
+arcpy.SetLogHistory(False)   # temporary joins are not worth recording in the geoprocessing history
+arcpy.env.autoCommit = 10000
+
+LOOKUPS = {}   # (source paths, key field, value fields) -> read-only lookup shared by every task of the process
+_lookups_lock = threading.RLock()
+_edit_state = threading.local()   # per thread: editors = {workspace: Editor opened by shared_editing_session}
+
+
+@functools.lru_cache(maxsize=None)
+def _workspace_of(fc):
+    """
+    Returns the workspace of a feature class, cached per path.
+    Parameters:
+    fc (str): Path to the feature class.
+    """
+    return arcpy.Describe(fc).path
 
-def update_fc_from_dict(source_fc, destination_fc, source_key_field, destination_key_field, field_pairs, where_clause):
+
+@functools.lru_cache(maxsize=None)
+def _field_types(fc):
     """
-    Update fields in a destination feature class based on values from a source feature class.
+    Returns a mapping of field name to field type for a feature class, cached per path. Call _field_types.cache_clear() after changing the schema.
     Parameters:
-    source_fc (str): Path to the source feature class.
-    destination_fc (str): Path to the destination feature class.
-    source_key_field (str): Key field in the source feature class.
-    destination_key_field (str): Key field in the destination feature class.
-    field_pairs (list of tuples): List of field pairs (source field, destination field).
-    where_clause (str): SQL where clause for filtering records.
+    fc (str): Path to the feature class.
     """
-    source_fields = [pair[0] for pair in field_pairs]
-    destination_fields = [pair[1] for pair in field_pairs]
-    fields_to_retrieve = [source_key_field] + source_fields
-    origin_fc_dict = {}
-    edit = arcpy.da.Editor(arcpy.Describe(destination_fc).path)
+    return {field.name: field.type for field in arcpy.ListFields(fc)}
+
+
+@functools.lru_cache(maxsize=None)
+def _oid_field(fc):
+    """
+    Returns the name of the ObjectID field of a feature class, cached per path.
+    Parameters:
+    fc (str): Path to the feature class.
+    """
+    return arcpy.Describe(fc).OIDFieldName
+
+
+def _shared_editors():
+    """
+    Returns the workspace -> Editor mapping of the shared edit sessions open in the current thread.
+    """
+    if not hasattr(_edit_state, 'editors'):
+        _edit_state.editors = {}
+    return _edit_state.editors
+
+
+@contextlib.contextmanager
+def shared_editing_session(workspace):
+    """
+    Keeps one edit session open on a workspace for a block of updates. Edit sessions opened inside the block by _editing_session reuse it
+    and only start their own operations; all edits are saved together when the block ends, or discarded if it fails.
+    Schema changes such as AddField are not allowed inside the block.
+    Parameters:
+    workspace (str): Path to the geodatabase.
+    """
+    editors = _shared_editors()
+    if workspace in editors:
+        yield
+        return
+    edit = arcpy.da.Editor(workspace)
     edit.startEditing(False, True)
-    edit.startOperation()
+    editors[workspace] = edit
     try:
-        with arcpy.da.SearchCursor(source_fc, fields_to_retrieve) as cursor:
-            for row in cursor:
-                key = row[0]
-                origin_fc_dict[key] = {source_fields[i]: row[i + 1] for i in range(len(source_fields))}
-        fields_to_update = [destination_key_field] + destination_fields
-        with arcpy.da.UpdateCursor(destination_fc, fields_to_update, where_clause) as cursor:
-            for row in cursor:
-                common_guid = row[0]
-                if common_guid in origin_fc_dict:
-                    related_data = origin_fc_dict[common_guid]
-                    for i in range(len(destination_fields)):
-                        row[i+1] = related_data[field_pairs[i][0]]
-                    cursor.updateRow(row)
-                else:
-                    pass
-        edit.stopOperation()
-        edit.stopEditing(True)  
+        yield
     except Exception as e:
-        edit.stopOperation()
         edit.stopEditing(False)
         print(f"Error during update: {e}")
         raise
+    else:
+        edit.stopEditing(True)
     finally:
-        arcpy.AddWarning(f"No related data found in feature class {source_fc} with key value {common_guid} from the destination feature class {destination_fc}")
+        del editors[workspace]
 
 
-def update_fc_within(inner_fc, outer_fc):
+@contextlib.contextmanager
+def _editing_session(fc):
     """
-    Update a field in the inner feature class to 'Station' if its polygon is within any polygon of the outer feature class.
+    Opens an edit session and operation on the workspace of a feature class; edits are saved on success and discarded on error.
+    Inside shared_editing_session only a new operation is started, and saving is left to the shared session.
+    Yields a function that wraps a cursor's updateRow so the operation is closed and reopened every EDIT_CHECKPOINT_ROWS written rows.
     Parameters:
-    inner_fc (str): Path to the inner feature class.
-    outer_fc (str): Path to the outer feature class.
+    fc (str): Path to the feature class that will be edited.
     """
-    outer_polygons = [row[0] for row in arcpy.da.SearchCursor(outer_fc, 'SHAPE@')]
-    edit = arcpy.da.Editor(arcpy.Describe(inner_fc).path)
-    edit.startEditing(False, True)
+    edit = _shared_editors().get(_workspace_of(fc))
+    shared = edit is not None
+    if not shared:
+        edit = arcpy.da.Editor(_workspace_of(fc))
+        edit.startEditing(False, True)
     edit.startOperation()
+    written_rows = 0
+
+    def checkpointed(update_row):
+        def update(row):
+            nonlocal written_rows
+            update_row(row)
+            written_rows += 1
+            if written_rows % EDIT_CHECKPOINT_ROWS == 0:
+                edit.stopOperation()
+                edit.startOperation()
+        return update
+
     try:
-        with arcpy.da.UpdateCursor(inner_fc, ['SHAPE@', 'MIG_PARENTTYPE']) as cursor:
-            for row in cursor:
-                inner_polygon = row[0]
-                if inner_polygon is None:
-                    print("Encountered a NoneType inner_polygon. Skipping this row.")
-                    continue
-                within_outer = any(inner_polygon.within(outer) for outer in outer_polygons if outer is not None)
-                if within_outer:
-                    row[1] = 'Station'
-                    cursor.updateRow(row)
+        yield checkpointed
         edit.stopOperation()
-        edit.stopEditing(True)  
+        if not shared:
+            edit.stopEditing(True)
+        _lookup_source_changed(fc)
     except Exception as e:
+        if shared:
+            edit.abortOperation()
+            raise
         edit.stopOperation()
         edit.stopEditing(False)
         print(f"Error during update: {e}")
         raise
 
 
+def _shared_lookup(source_fcs, source_key_field, source_fields, build):
+    """
+    Returns the entry of LOOKUPS for the given sources and fields, building it on first use, so a source shared by several
+    targets is read once per process. The store is cleared of an entry when one of its sources is edited.
+    Parameters:
+    source_fcs (tuple): Paths to the source feature classes the entry is read from.
+    source_key_field (str): Key field in the source feature classes.
+    source_fields (tuple): Fields whose values the entry holds, in this order.
+    build (callable): Called without arguments to read the entry; must return a read-only value.
+    """
+    key = (source_fcs, source_key_field, source_fields)
+    with _lookups_lock:
+        lookup = LOOKUPS.get(key)
+        if lookup is None:
+            lookup = LOOKUPS[key] = build()
+        return lookup
+
+
+def _load_lookup(source_fc, source_key_field, source_fields):
+    """
+    Returns the full lookup of a source feature class as a read-only mapping of key value to the tuple of source field values.
+    Parameters:
+    source_fc (str): Path to the source feature class.
+    source_key_field (str): Key field in the source feature class.
+    source_fields (tuple): Fields whose values are returned, in this order.
+    """
+    return _shared_lookup((source_fc,), source_key_field, source_fields,
+                          lambda: types.MappingProxyType(_load_source_dict(source_fc, source_key_field, source_fields)))
+
+
+def _load_key_set(source_fc, source_key_field):
+    """
+    Returns the distinct values of a key field of a source feature class as a frozenset, shared through LOOKUPS.
+    Parameters:
+    source_fc (str): Path to the source feature class.
+    source_key_field (str): Key field in the source feature class.
+    """
+    def build():
+        with arcpy.da.SearchCursor(source_fc, [source_key_field]) as cursor:
+            return frozenset(row[0] for row in cursor)
+    return _shared_lookup((source_fc,), source_key_field, (), build)
+
+
+def _lookup_source_changed(fc):
+    """
+    Drops the shared lookups read from a feature class after it has been edited.
+    Parameters:
+    fc (str): Path to the edited feature class.
+    """
+    with _lookups_lock:
+        for key in [key for key in LOOKUPS if fc in key[0]]:
+            del LOOKUPS[key]
+
+
+def _temp_path(name):
+    """
+    Returns a unique path in the memory workspace for an intermediate output, so concurrent calls do not collide.
+    Parameters:
+    name (str): Base name of the intermediate output.
+    """
+    return f"memory\\{name}_{uuid.uuid4().hex}"
+
+
+def _sql_in_clauses(fc, field, values, chunk_size=SQL_IN_CHUNK_SIZE):
+    """
+    Yields where clauses of the form "field IN (...)" that together select all given values.
+    Parameters:
+    fc (str): Path to the feature class the clauses are used on.
+    field (str): Name of the field to filter.
+    values (iterable): Values to select; None values are skipped.
+    chunk_size (int): Maximum number of values per clause, default is SQL_IN_CHUNK_SIZE.
+    """
+    delimited_field = arcpy.AddFieldDelimiters(fc, field)
+    literals = []
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, str):
+            literals.append("'" + value.replace("'", "''") + "'")
+        else:
+            literals.append(str(value))
+    for start in range(0, len(literals), chunk_size):
+        yield f"{delimited_field} IN ({','.join(literals[start:start + chunk_size])})"
+
+
+def _load_source_dict(source_fc, source_key_field, source_fields, needed_keys=None):
+    """
+    Reads a source feature class into a dictionary of key value to the tuple of source field values.
+    Parameters:
+    source_fc (str): Path to the source feature class.
+    source_key_field (str): Key field in the source feature class.
+    source_fields (list): Fields whose values are returned, in this order.
+    needed_keys (set, optional): Keys referenced by the destination; when there are at most MAX_PUSHDOWN_KEYS only those rows are read.
+    """
+    source_where_clauses = [None]
+    if needed_keys is not None and len(needed_keys) <= MAX_PUSHDOWN_KEYS:
+        source_where_clauses = list(_sql_in_clauses(source_fc, source_key_field, needed_keys))
+    origin_fc_dict = {}
+    for source_where_clause in source_where_clauses:
+        with arcpy.da.SearchCursor(source_fc, [source_key_field] + list(source_fields), source_where_clause) as cursor:
+            origin_fc_dict.update((row[0], tuple(row[1:])) for row in cursor)
+    return origin_fc_dict
+
+
+@functools.lru_cache(maxsize=None)
+def _combine_where_clauses(where_clauses):
+    """
+    Returns the where clause selecting the rows of any of the given clauses, or None when one of them selects every row.
+    Parameters:
+    where_clauses (frozenset): Where clauses of the joins; None stands for no filter.
+    """
+    if None in where_clauses:
+        return None
+    if len(where_clauses) == 1:
+        return next(iter(where_clauses))
+    return " OR ".join(f"({clause})" for clause in sorted(where_clauses))
+
+
+@functools.lru_cache(maxsize=None)
+def _cursor_plan(field_groups):
+    """
+    Resolves the cursor field list and the column positions of a series of joins once per field layout.
+    Returns the tuple of cursor fields (starting with 'OID@') and, per join, the key position and the tuple of write positions.
+    Parameters:
+    field_groups (tuple): Per join, a tuple of the destination key field followed by the destination fields it writes.
+    """
+    field_positions = {'OID@': 0}
+    for group in field_groups:
+        for field in group:
+            field_positions.setdefault(field, len(field_positions))
+    return tuple(field_positions), tuple((field_positions[group[0]], tuple(field_positions[field] for field in group[1:])) for group in field_groups)
+
+
+def update_fc_multi(destination_fc, joins):
+    """
+    Update fields in a destination feature class from one or more source feature classes in a single cursor pass.
+    Joins are applied in order, so a later join overwrites a field written by an earlier one.
+    Only attribute fields may be named: cursors read exactly the key and field-pair columns, never geometry tokens or '*'.
+    Parameters:
+    destination_fc (str): Path to the destination feature class.
+    joins (list of tuples): Each tuple contains the source feature class (a path, or a dictionary
+                            of key value to the tuple of source field values), the source key field, the destination key field, the list of field pairs (source field,
+                            destination field) and the SQL where clause for the destination rows.
+    """
+    for _, source_key_field, destination_key_field, field_pairs, _ in joins:
+        for field in [source_key_field, destination_key_field] + [field for pair in field_pairs for field in pair]:
+            if field == '*' or field.upper().startswith('SHAPE'):
+                raise ValueError(f"update_fc_multi copies attributes only; '{field}' would pull geometry or all fields into the cursor.")
+    active_joins = []
+    for source_fc, source_key_field, destination_key_field, field_pairs, where_clause in joins:
+        if isinstance(source_fc, collections.abc.Mapping):
+            source_name = "the preloaded lookup"
+        else:
+            source_name = source_fc
+        selected_rows = None
+        needed_keys = None
+        if where_clause:
+            # A filtered destination usually needs only a few source rows, so read just the keys it references.
+            with arcpy.da.SearchCursor(destination_fc, ['OID@', destination_key_field], where_clause) as cursor:
+                selected_rows = list(cursor)
+            needed_keys = {row[1] for row in selected_rows}
+        source_fields = tuple(pair[0] for pair in field_pairs)
+        if isinstance(source_fc, collections.abc.Mapping):
+            origin_fc_dict = source_fc
+        elif needed_keys is None or len(needed_keys) > MAX_PUSHDOWN_KEYS:
+            origin_fc_dict = _load_lookup(source_fc, source_key_field, source_fields)
+        else:
+            origin_fc_dict = _load_source_dict(source_fc, source_key_field, source_fields, needed_keys)
+        if not origin_fc_dict or (needed_keys is not None and needed_keys.isdisjoint(origin_fc_dict)):
+            print(f"No related data in {source_name} for {destination_fc}; its fields are skipped.")
+            continue
+        active_joins.append((source_name, origin_fc_dict, destination_key_field, field_pairs, where_clause or None, selected_rows))
+    if not active_joins:
+        return
+    combined_where = _combine_where_clauses(frozenset(join[4] for join in active_joins))
+    fields, join_positions = _cursor_plan(tuple((join[2],) + tuple(pair[1] for pair in join[3]) for join in active_joins))
+    fields = list(fields)
+    lookups = []
+    for (_, origin_fc_dict, _, _, where_clause, selected_rows), (key_index, write_indexes) in zip(active_joins, join_positions):
+        selected_oids = None   # None means every row read by the combined cursor belongs to this join
+        if where_clause is not None and where_clause != combined_where:
+            selected_oids = {row[0] for row in selected_rows}
+        lookups.append((origin_fc_dict, key_index, list(write_indexes), selected_oids))
+    unmatched_counts = [0] * len(lookups)
+    # Columns are labelled by field position; object dtype keeps NULLs as None instead of turning integer columns into floats.
+    with arcpy.da.SearchCursor(destination_fc, fields, combined_where) as cursor:
+        current = pd.DataFrame(list(cursor), columns=range(len(fields)), dtype=object)
+    updated = current.copy()
+    for position, (origin_fc_dict, key_index, write_indexes, selected_oids) in enumerate(lookups):
+        keys = current[key_index] if selected_oids is None else current.loc[current[0].isin(selected_oids), key_index]
+        related_data = keys.map(origin_fc_dict).dropna()   # one hash join per lookup instead of a dict lookup per row
+        unmatched_counts[position] = len(keys) - len(related_data)
+        if len(related_data):
+            updated.loc[related_data.index, write_indexes] = pd.DataFrame(related_data.tolist(), index=related_data.index,
+                                                                          columns=write_indexes, dtype=object)
+    changed = (updated.ne(current) & ~(updated.isna() & current.isna())).any(axis=1)
+    changed_rows = {row[0]: list(row) for row in updated[changed].itertuples(index=False, name=None)}   # OID -> row to write
+    if changed_rows:
+        if len(changed_rows) <= MAX_PUSHDOWN_KEYS:
+            update_where_clauses = list(_sql_in_clauses(destination_fc, _oid_field(destination_fc), changed_rows))
+        else:
+            update_where_clauses = [combined_where]
+        with _editing_session(destination_fc) as checkpointed:
+            for update_where_clause in update_where_clauses:
+                with arcpy.da.UpdateCursor(destination_fc, fields, update_where_clause) as cursor:
+                    update = checkpointed(cursor.updateRow)
+                    for row in cursor:
+                        new_row = changed_rows.get(row[0])
+                        if new_row is not None:
+                            update(new_row)
+    for (source_name, *_), unmatched_count in zip(active_joins, unmatched_counts):
+        if unmatched_count:
+            arcpy.AddWarning(f"{unmatched_count} rows in {destination_fc} had no related data in {source_name}")
+
+
+def update_fc_from_dict(source_fc, destination_fc, source_key_field, destination_key_field, field_pairs, where_clause):
+    """
+    Update fields in a destination feature class based on values from a source feature class.
+    Parameters:
+    source_fc (str or mapping): Path to the source feature class, or a lookup already loaded with _load_lookup.
+    destination_fc (str): Path to the destination feature class.
+    source_key_field (str): Key field in the source feature class.
+    destination_key_field (str): Key field in the destination feature class.
+    field_pairs (list of tuples): List of field pairs (source field, destination field).
+    where_clause (str): SQL where clause for filtering records.
+    """
+    update_fc_multi(destination_fc, [(source_fc, source_key_field, destination_key_field, field_pairs, where_clause)])
+
+
+def update_fc_within(inner_fc, outer_fc):
+    """
+    Update a field in the inner feature class to 'Station' if its polygon is within any polygon of the outer feature class.
+    Parameters:
+    inner_fc (str): Path to the inner feature class.
+    outer_fc (str): Path to the outer feature class.
+    """
+    temp_join = _temp_path("within_join")
+    arcpy.analysis.SpatialJoin(target_features=inner_fc, join_features=outer_fc, out_feature_class=temp_join, join_operation="JOIN_ONE_TO_ONE",
+                               join_type="KEEP_COMMON", field_mapping=None, match_option="WITHIN", search_radius=None, distance_field_name=None)
+    try:
+        with _editing_session(inner_fc) as checkpointed:
+            inner_within_outer = {row[0] for row in arcpy.da.SearchCursor(temp_join, ['TARGET_FID'])}
+            with arcpy.da.UpdateCursor(inner_fc, ['OID@', 'MIG_PARENTTYPE']) as cursor:
+                update = checkpointed(cursor.updateRow)
+                for oid, parent_type in cursor:
+                    if oid in inner_within_outer and parent_type != 'Station':
+                        update((oid, 'Station'))
+    finally:
+        if arcpy.Exists(temp_join):
+            arcpy.management.Delete(temp_join)
+
+
 def update_fc_self(source_fc, field_updates):
     """
     Updates fields within the same feature class based on a list of field pairs.
@@ -83,39 +404,45 @@ def update_fc_self(source_fc, field_updates):
     source_fc (str): Path to the feature class.
     field_updates (list of tuples): Each tuple contains the original field and the new fields to populate.
     """
-    fields = [item for sublist in field_updates for item in sublist]
-    fields_populated = {field: False for field in fields}
-    edit = arcpy.da.Editor(arcpy.Describe(source_fc).path)
-    edit.startEditing(False, True)
-    edit.startOperation()
+    field_types = _field_types(source_fc)
+    field_expressions = []
+    for update_sub_tuple in field_updates:
+        source_field = update_sub_tuple[0]
+        for each_target_field in update_sub_tuple[1:]:
+            if _field_has_data(source_fc, each_target_field, field_types.get(each_target_field)):
+                print(f"The field '{each_target_field}' in the feature class {source_fc} already contains data. Any existing data will be overwritten.")
+            if 'TEXT' in each_target_field:
+                field_expressions.append([each_target_field, f"str(!{source_field}!)"])
+            else:
+                field_expressions.append([each_target_field, f"!{source_field}!"])
     try:
-        with arcpy.da.UpdateCursor(source_fc, fields) as cursor:
-            for row in cursor:
-                for update_sub_tuple in field_updates:
-                    source_field = update_sub_tuple[0]
-                    source_index = fields.index(source_field)
-                    source_value = row[source_index]
-                    for each_target_field in update_sub_tuple[1:]:
-                        target_index = fields.index(each_target_field)
-                        if row[target_index] not in [None, '', 0]:
-                            if not fields_populated[each_target_field]:
-                                print(f"The field '{each_target_field}' in the feature class {source_fc} already contains data. Any existing data will be overwritten.")
-                                fields_populated[each_target_field] = True
-                        if 'TEXT' in each_target_field:
-                            row[target_index] = str(source_value)
-                        else:
-                            row[target_index] = source_value
-                cursor.updateRow(row)
-        edit.stopOperation()
-        edit.stopEditing(True)  
+        # One column-wise calculation inside the geodatabase engine instead of a Python loop over every row.
+        arcpy.management.CalculateFields(source_fc, "PYTHON3", field_expressions)
     except Exception as e:
-        edit.stopOperation()
-        edit.stopEditing(False)
         print(f"Error during update: {e}")
         raise
+    _lookup_source_changed(source_fc)
     print("Self-update completed successfully.")
 
 
+def _field_has_data(fc, field, field_type):
+    """
+    Checks whether any row of a feature class holds a value other than NULL, '' or 0 in a field.
+    Parameters:
+    fc (str): Path to the feature class.
+    field (str): Name of the field to check.
+    field_type (str): Type of the field as reported by arcpy.ListFields.
+    """
+    delimited_field = arcpy.AddFieldDelimiters(fc, field)
+    where_clause = f"{delimited_field} IS NOT NULL"
+    if field_type == 'String':
+        where_clause += f" AND {delimited_field} <> ''"
+    elif field_type in ('SmallInteger', 'Integer', 'BigInteger', 'Single', 'Double'):
+        where_clause += f" AND {delimited_field} <> 0"
+    with arcpy.da.SearchCursor(fc, [field], where_clause) as cursor:
+        return next(iter(cursor), None) is not None
+
+
 def update_mig_voltage(join_internal, join_conductor, join_busbar, dest_fc):
     """
     Updates the MIG_VOLTAGE field in the destination feature class based on spatial joins with InternalConnection, Conductor, and Busbar feature classes.
@@ -138,30 +465,19 @@ def update_mig_voltage(join_internal, join_conductor, join_busbar, dest_fc):
         """
         fields_to_retrieve = [source_globalid, operatingvoltage]
         origin_fc_dict = {}
-        edit = arcpy.da.Editor(arcpy.Describe(dest_fc).path)
-        edit.startEditing(False, True)
-        edit.startOperation()
         try:
-            with arcpy.da.SearchCursor(source_fc, fields_to_retrieve) as cursor:
-                for row in cursor:
-                    key = row[0]
-                    voltage = row[1]
-                    if key and voltage:
-                        origin_fc_dict[key] = voltage
-            with arcpy.da.UpdateCursor(destination_fc, [dest_globalid, mig_voltage]) as cursor:
-                for row in cursor:
-                    common_guid = row[0]
-                    if common_guid in origin_fc_dict:
-                        row[1] = origin_fc_dict[common_guid]
-                        cursor.updateRow(row)
-        except Exception as e:
-            edit.stopOperation()
-            edit.stopEditing(False)
-            print(f"Error during update: {e}")
-            raise
-        else:
-            edit.stopOperation()
-            edit.stopEditing(True)
+            with _editing_session(destination_fc) as checkpointed:
+                with arcpy.da.SearchCursor(source_fc, fields_to_retrieve) as cursor:
+                    for row in cursor:
+                        key = row[0]
+                        voltage = row[1]
+                        if key and voltage:
+                            origin_fc_dict[key] = voltage
+                with arcpy.da.UpdateCursor(destination_fc, [dest_globalid, mig_voltage]) as cursor:
+                    update = checkpointed(cursor.updateRow)
+                    for common_guid, _ in cursor:
+                        if common_guid in origin_fc_dict:
+                            update((common_guid, origin_fc_dict[common_guid]))
         finally:
             print("MIG_VOLTAGE field updated successfully.")
     try:
@@ -202,46 +518,38 @@ def update_field_based_on_whether_it_lies(target_fc, mapping_layers, mig_parentt
     objectid (str): Name of the OBJECTID field in the destination feature class.
     mig_parenttype (str): Name of the field in the destination feature class to update with the migrated parent.
     """
-    updated_features = set()  # Set to track updated feature IDs
+    feature_values = {}  # TARGET_FID -> value; the first mapping layer a feature intersects wins
     for join_fc, value in mapping_layers.items():
-        temp_join = "TempJoin"
+        temp_join = _temp_path("TempJoin")
         arcpy.analysis.SpatialJoin(target_features=target_fc, join_features=join_fc, out_feature_class=temp_join, join_operation="JOIN_ONE_TO_ONE", 
                                    join_type="KEEP_COMMON", field_mapping=None, match_option="INTERSECT", search_radius=None, distance_field_name=None)
-        features_to_update = set()
-        edit = arcpy.da.Editor(arcpy.Describe(target_fc).path)
-        edit.startEditing(False, True)
-        edit.startOperation()
         try:
             with arcpy.da.SearchCursor(temp_join, ['TARGET_FID']) as cursor:
                 for row in cursor:
-                    if row[0] not in updated_features:  
-                        features_to_update.add(row[0])
-            local_count = 0
-            with arcpy.da.UpdateCursor(target_fc, [mig_parenttype, objectid]) as cursor:
-                for row in cursor:
-                    if row[1] in features_to_update:
-                        row[0] = value
-                        cursor.updateRow(row) 
-                        updated_features.add(row[1])
-                        local_count += 1
-            edit.stopOperation()
-            edit.stopEditing(True)  
-        except Exception as e:
-            edit.stopOperation()
-            edit.stopEditing(False)
-            print(f"Error during update: {e}")
-            raise
+                    feature_values.setdefault(row[0], value)
         finally:
-            print(f"Updated {local_count} features in '{target_fc}' with the value '{value}' for 'MIG_PARENTTYPE'.")
             if arcpy.Exists(temp_join):
                 arcpy.management.Delete(temp_join)
-    total_updated_features = len(updated_features)
+    updated_counts = {value: 0 for value in mapping_layers.values()}
+    try:
+        with _editing_session(target_fc) as checkpointed:
+            with arcpy.da.UpdateCursor(target_fc, [mig_parenttype, objectid]) as cursor:
+                update = checkpointed(cursor.updateRow)
+                for _, oid in cursor:
+                    value = feature_values.get(oid)
+                    if value is not None:
+                        update((value, oid))
+                        updated_counts[value] += 1
+    finally:
+        for value, local_count in updated_counts.items():
+            print(f"Updated {local_count} features in '{target_fc}' with the value '{value}' for 'MIG_PARENTTYPE'.")
+    total_updated_features = sum(updated_counts.values())
     print(f"Total updated features in all categories: {total_updated_features}")
 
-def classify_junction(subtypes, overhead_types, underground_types):
-    if all(subtype in overhead_types for subtype in subtypes):
+def classify_junction(subtype_mask):
+    if subtype_mask == OVERHEAD_BIT:
         return "Overhead Conductor"
-    elif all(subtype in underground_types for subtype in subtypes):
+    elif subtype_mask == UNDERGROUND_BIT:
         return "Underground Conductor"
     else:
         return "Overhead Conductor Underground Conductor"
@@ -256,45 +564,96 @@ def update_conductor_type(target_fc, conductor_fc, mig_parenttype, subtype_field
     mig_parenttype (str): Name of the field in the destination feature class to update.
     subtype_field (str): Name of the subtype field in the Conductor feature class.
     """
-    temp_join = "TempJoinConductor"
+    temp_join = _temp_path("TempJoinConductor")
     arcpy.analysis.SpatialJoin(target_features=target_fc, join_features=conductor_fc, out_feature_class=temp_join, join_operation="JOIN_ONE_TO_MANY", 
                                join_type="KEEP_COMMON", field_mapping=None, match_option="INTERSECT", search_radius=None, distance_field_name=None)
-    junction_conductor_map = {}
-    overhead_types = ["Въздушна линия ВН", "Въздушна линия СрН", "Въздушна линия НН", "Въздушна изолирана линия СрН", "Въздушна изолирана линия НН"]
-    underground_types = ["Кабелна линия ВН", "Кабелна линия СрН", "Кабелна линия НН", "Земно въже ВН", "Земно въже СрН"]
-    with arcpy.da.SearchCursor(temp_join, ['TARGET_FID', subtype_field]) as cursor:
-        for row in cursor:
-            target_fid = row[0]
-            subtype_cd = row[1]
-            if target_fid not in junction_conductor_map:
-                junction_conductor_map[target_fid] = set()
-            junction_conductor_map[target_fid].add(subtype_cd)
     updated_count = 0
-    edit = arcpy.da.Editor(arcpy.Describe(target_fc).path)
-    edit.startEditing(False, True)
-    edit.startOperation()
     try:
-        with arcpy.da.UpdateCursor(target_fc, [mig_parenttype, 'OBJECTID']) as cursor:
-            for row in cursor:
-                if row[0] == 'Conductor' and row[1] in junction_conductor_map:
-                    subtype_set = junction_conductor_map[row[1]]
-                    row[0] = classify_junction(subtype_set, overhead_types, underground_types)
-                    cursor.updateRow(row)
-                    updated_count += 1
-        edit.stopOperation()
-        edit.stopEditing(True)
-    except Exception as e:
-        edit.stopOperation()
-        edit.stopEditing(False)
-        print(f"Error during update: {e}")
-        raise
+        # NULL subtypes need a placeholder of the field's own type; either placeholder falls through to OTHER_SUBTYPE_BIT.
+        null_subtype = '' if _field_types(temp_join).get(subtype_field) == 'String' else -1
+        joined = arcpy.da.TableToNumPyArray(temp_join, ['TARGET_FID', subtype_field], null_value={subtype_field: null_subtype})
+        # Each distinct subtype gets a bit, and the bits of all conductors touching a junction are OR-ed together per TARGET_FID.
+        subtypes, subtype_positions = np.unique(joined[subtype_field], return_inverse=True)
+        subtype_bits = np.array([SUBTYPE_BITS.get(subtype, OTHER_SUBTYPE_BIT) for subtype in subtypes], dtype=np.uint8)
+        target_fids = joined['TARGET_FID']
+        subtype_masks = np.zeros(int(target_fids.max()) + 1 if target_fids.size else 0, dtype=np.uint8)
+        np.bitwise_or.at(subtype_masks, target_fids, subtype_bits[subtype_positions.ravel()])
+        junction_conductor_map = {int(fid): classify_junction(subtype_masks[fid]) for fid in np.unique(target_fids)}
+        with _editing_session(target_fc) as checkpointed:
+            with arcpy.da.UpdateCursor(target_fc, [mig_parenttype, 'OBJECTID']) as cursor:
+                update = checkpointed(cursor.updateRow)
+                for parent_type, oid in cursor:
+                    if parent_type == 'Conductor' and oid in junction_conductor_map:
+                        update((junction_conductor_map[oid], oid))
+                        updated_count += 1
     finally:
         print(f"Updated {updated_count} 'Conductor' features in '{target_fc}' with specific conductor types.")
         if arcpy.Exists(temp_join):
             arcpy.management.Delete(temp_join)
 
 
-def update_line_fc_within_station_boundary(line_fc, station_fc, globalid_field, mig_stationguid_field, field_name='LINE_STATUS', field_type='TEXT', field_length=15):
+@functools.lru_cache(maxsize=None)
+def _station_polygons(station_fc, globalid_field):
+    """
+    Returns a mapping of station global ID to station polygon, cached per process so classes checked against the same stations read them once.
+    Parameters:
+    station_fc (str): Path to the station feature class.
+    globalid_field (str): The field name for the station feature class global ID.
+    """
+    with arcpy.da.SearchCursor(station_fc, [globalid_field, 'SHAPE@']) as cursor:
+        return {row[0]: row[1] for row in cursor if row[1] is not None}
+
+
+def _station_join_map(target_fc, station_fc, globalid_field, match_option, temp_join, join_operation="JOIN_ONE_TO_ONE"):
+    """
+    Spatially joins features to stations and returns a mapping of feature OID to the global ID of the matched station.
+    With 'JOIN_ONE_TO_MANY' every OID maps to the list of the global IDs of all matched stations, in station feature class order.
+    Parameters:
+    target_fc (str): Path to the point or line feature class.
+    station_fc (str): Path to the station feature class.
+    globalid_field (str): The field name for the station feature class global ID.
+    match_option (str): SpatialJoin match option, e.g. 'COMPLETELY_WITHIN' or 'INTERSECT'.
+    temp_join (str): Path of the temporary join output, deleted before returning.
+    join_operation (str): 'JOIN_ONE_TO_ONE' (default) or 'JOIN_ONE_TO_MANY'.
+    """
+    field_map = arcpy.FieldMap()
+    field_map.addInputField(station_fc, globalid_field)
+    output_field = field_map.outputField
+    output_field.name = 'STATION_GID'
+    output_field.aliasName = 'STATION_GID'
+    field_map.outputField = output_field
+    field_mappings = arcpy.FieldMappings()
+    field_mappings.addFieldMap(field_map)
+    arcpy.analysis.SpatialJoin(target_features=target_fc, join_features=station_fc, out_feature_class=temp_join, join_operation=join_operation,
+                               join_type="KEEP_COMMON", field_mapping=field_mappings, match_option=match_option)
+    try:
+        with arcpy.da.SearchCursor(temp_join, ['TARGET_FID', 'JOIN_FID', 'STATION_GID']) as cursor:
+            matches = list(cursor)
+    finally:
+        if arcpy.Exists(temp_join):
+            arcpy.management.Delete(temp_join)
+    if join_operation == "JOIN_ONE_TO_ONE":
+        return {target_fid: station_global_id for target_fid, _, station_global_id in matches}
+    station_map = {}
+    for target_fid, _, station_global_id in sorted(matches, key=lambda match: match[1]):
+        station_map.setdefault(target_fid, []).append(station_global_id)
+    return station_map
+
+
+def _line_sample_points(line_geom):
+    """
+    Returns the first, middle and last points of a line as point geometries, for cheap point-in-polygon tests.
+    Parameters:
+    line_geom (arcpy.Polyline): The line geometry.
+    """
+    spatial_reference = line_geom.spatialReference
+    yield arcpy.PointGeometry(line_geom.firstPoint, spatial_reference)
+    yield line_geom.positionAlongLine(0.5, True)
+    yield arcpy.PointGeometry(line_geom.lastPoint, spatial_reference)
+
+
+def update_line_fc_within_station_boundary(line_fc, station_fc, globalid_field, mig_stationguid_field, field_name='LINE_STATUS', field_type='TEXT', field_length=15,
+                                           station_shapes=None):
     """
     Updates line feature class based on spatial relationships with station boundaries.Lines can be inside, on the boundary, or outside station polygons.
     Parameters:
@@ -305,56 +664,51 @@ def update_line_fc_within_station_boundary(line_fc, station_fc, globalid_field,
     field_name (str): The name of the field to add or check, default is 'LINE_STATUS'.
     field_type (str): The data type of the field, default is 'TEXT'.
     field_length (int): The length of the field if it is a 'TEXT' type, default is 15.
+    station_shapes (dict): Station global ID -> Esri JSON of the station polygon, read once by the caller for several line classes;
+                           default is None, which reads the polygons from station_fc.
     """
-    fields = [field.name for field in arcpy.ListFields(line_fc)]
     field_added = False
-    if field_name not in fields:
+    if field_name not in _field_types(line_fc):
         arcpy.AddField_management(line_fc, field_name, field_type, field_length=field_length)
+        _field_types.cache_clear()
         print(f"Field '{field_name}' was added in {line_fc}.")
         field_added = True
     else:
         print(f"Field '{field_name}' already exists in {line_fc}.")
-    station_dict = {row[0]: row[1] for row in arcpy.da.SearchCursor(station_fc, [globalid_field, 'SHAPE@'])}
-    edit = arcpy.da.Editor(arcpy.Describe(line_fc).path)
-    edit.startEditing(False, True)
-    edit.startOperation()
     try:
-        with arcpy.da.UpdateCursor(line_fc, ['SHAPE@', mig_stationguid_field, field_name]) as cursor:
-            for row in cursor:
-                line_geom = row[0]
+        if station_shapes is None:
+            station_polygons = _station_polygons(station_fc, globalid_field)
+        else:
+            station_polygons = {station_global_id: arcpy.AsShape(shape, True) for station_global_id, shape in station_shapes.items()}
+        # The native join finds the stations each line intersects; only the first of them still needs the exact covers test.
+        line_stations = _station_join_map(line_fc, station_fc, globalid_field, "INTERSECT", _temp_path("line_station_join"), "JOIN_ONE_TO_MANY")
+        line_status = {}
+        with arcpy.da.SearchCursor(line_fc, ['OID@', 'SHAPE@']) as cursor:
+            for oid, line_geom in cursor:
                 if line_geom is None:
                     print("Encountered a NoneType line geometry. Skipping this row.")
                     continue
-                status_updated = False
-                for station_global_id, station_polygon in station_dict.items():
-                    if station_polygon is None:
-                        continue
-                    if line_geom.within(station_polygon):
-                        row[1] = station_global_id
-                        row[2] = 'Inside'
-                        cursor.updateRow(row)
-                        status_updated = True
-                        break
-                    elif not line_geom.disjoint(station_polygon):
-                        row[1] = station_global_id
-                        row[2] = 'Partly Inside'
-                        cursor.updateRow(row)
-                        status_updated = True
-                        break
-                if not status_updated:
-                    row[1] = None
-                    row[2] = 'Outside'
-                    cursor.updateRow(row)          
-        edit.stopOperation()
-        edit.stopEditing(True)  
-    except Exception as e:
-        edit.stopOperation()
-        edit.stopEditing(False)
-        print(f"Error during update: {e}")
-        raise
+                station_global_ids = line_stations.get(oid)
+                if not station_global_ids:
+                    line_status[oid] = (None, 'Outside')
+                    continue
+                station_polygon = station_polygons[station_global_ids[0]]
+                # A sample vertex outside the station already rules out "Inside"; only lines whose samples are all covered need the exact test.
+                if all(station_polygon.contains(point, "BOUNDARY") for point in _line_sample_points(line_geom)) and station_polygon.contains(line_geom, "BOUNDARY"):   # covers: a line running along the boundary still counts as inside
+                    line_status[oid] = (station_global_ids[0], 'Inside')
+                else:
+                    line_status[oid] = (station_global_ids[0], 'Partly Inside')
+        with _editing_session(line_fc) as checkpointed:
+            with arcpy.da.UpdateCursor(line_fc, ['OID@', mig_stationguid_field, field_name]) as cursor:
+                update = checkpointed(cursor.updateRow)
+                for oid, _, _ in cursor:
+                    status = line_status.get(oid)
+                    if status is not None:
+                        update((oid,) + status)
     finally:
         if field_added:
             arcpy.DeleteField_management(line_fc, field_name)
+            _field_types.cache_clear()
             print(f"Field '{field_name}' was deleted from {line_fc}.")
 
 
@@ -372,72 +726,38 @@ def update_point_fc_within_station_boundary(point_fc, station_fc, globalid_field
     field_type (str): The data type of the field, default is 'TEXT'.
     field_length (int): The length of the field if it is a 'TEXT' type, default is 15.
     """
-    fields = [field.name for field in arcpy.ListFields(point_fc)]
     field_added = False
-    if field_name not in fields:
+    if field_name not in _field_types(point_fc):
         arcpy.AddField_management(point_fc, field_name, field_type, field_length=field_length)
+        _field_types.cache_clear()
         print(f"Field '{field_name}' was added in {point_fc}.")
         field_added = True
     else:
         print(f"Field '{field_name}' already exists in {point_fc}.")
-    station_dict = {row[0]: row[1] for row in arcpy.da.SearchCursor(station_fc, [globalid_field, 'SHAPE@'])}
-    edit = arcpy.da.Editor(arcpy.Describe(point_fc).path)
-    edit.startEditing(False, True)
-    edit.startOperation()
     try:
-        with arcpy.da.UpdateCursor(point_fc, ['SHAPE@', mig_stationguid_field, field_name]) as cursor:
-            for row in cursor:
-                point_geom = row[0]
-                if point_geom is None:
-                    print("Encountered a NoneType point geometry. Skipping this row.")
-                    continue
-                status_updated = False
-                for station_global_id, station_polygon in station_dict.items():
-                    if station_polygon is None:
-                        continue
-                    if point_geom.within(station_polygon):
-                        row[1] = station_global_id
-                        row[2] = 'Inside'
-                        cursor.updateRow(row)
-                        status_updated = True
-                        break
-                    elif point_geom.touches(station_polygon):
-                        row[1] = station_global_id
-                        row[2] = 'On Boundary'
-                        cursor.updateRow(row)
-                        status_updated = True
-                        break
-                if not status_updated:
-                    row[1] = None
-                    row[2] = 'Outside'
-                    cursor.updateRow(row)          
-        edit.stopOperation()
-        edit.stopEditing(True)  
-    except Exception as e:
-        edit.stopOperation()
-        edit.stopEditing(False)
-        print(f"Error during update: {e}")
-        raise
+        # Interior and boundary matches come from two native spatial joins; a point on the boundary is intersected but not completely within.
+        inside_map = _station_join_map(point_fc, station_fc, globalid_field, "COMPLETELY_WITHIN", _temp_path("within_join"))
+        boundary_map = _station_join_map(point_fc, station_fc, globalid_field, "INTERSECT", _temp_path("touches_join"))
+        with _editing_session(point_fc) as checkpointed:
+            with arcpy.da.UpdateCursor(point_fc, ['OID@', mig_stationguid_field, field_name]) as cursor:
+                update = checkpointed(cursor.updateRow)
+                for row in cursor:
+                    oid = row[0]
+                    if oid in inside_map:
+                        new_row = (oid, inside_map[oid], 'Inside')
+                    elif oid in boundary_map:
+                        new_row = (oid, boundary_map[oid], 'On Boundary')
+                    else:
+                        new_row = (oid, None, 'Outside')
+                    if tuple(row) != new_row:
+                        update(new_row)
     finally:
         if field_added:
             arcpy.DeleteField_management(point_fc, field_name)
+            _field_types.cache_clear()
             print(f"Field '{field_name}' was deleted from {point_fc}.")
 
 
-def check_relationship(source_fc, global_id_column, global_id_value):
-    """
-    Parameters:
-    Checks if a specific global ID value exists in a specified column of a feature class.
-    source_fc (str): Path to the source feature class to search.
-    global_id_column (str): Name of the column containing the global ID.
-    global_id_value (str): The global ID value to search for.
-    """
-    with arcpy.da.SearchCursor(source_fc, [global_id_column]) as cursor:
-        for row in cursor:
-            if row[0] == global_id_value:
-                return True
-    return False
-
 def update_mig_issource(dest_fc, source_fc=None, objectid_column=None, fields = None):
     """
     Parameters:
@@ -447,268 +767,411 @@ def update_mig_issource(dest_fc, source_fc=None, objectid_column=None, fields =
     source_fc (str, optional): Path to the source feature class for relationship checking.
     global_id_column (str, optional): Name of the column containing the global ID in the source feature class.
     """
-    warning_is_printed = False
-    edit = arcpy.da.Editor(arcpy.Describe(dest_fc).path)
-    edit.startEditing(False, True)
-    edit.startOperation()
-    try:
+    source_keys = frozenset()
+    if source_fc and objectid_column:
+        try:
+            source_keys = _load_key_set(source_fc, objectid_column)
+        except Exception as e:
+            print(f"Warning: Could not check relationships against {source_fc} for {dest_fc}. Error: {str(e)}")
+    with _editing_session(dest_fc) as checkpointed:
         with arcpy.da.UpdateCursor(dest_fc, fields) as cursor:
-            for row in cursor:
-                subsource = row[0]
-                objectid_value = row[2]
-                relationship_exists = False
-                if source_fc and objectid_column:
-                    try:
-                        relationship_exists = check_relationship(source_fc, objectid_column, objectid_value)
-                    except Exception as e:
-                        if not warning_is_printed:
-                            print(f"Warning: Could not check relationship for GLOBALID {objectid_value} in {dest_fc}. Error: {str(e)}")
-                            warning_is_printed = True
+            update = checkpointed(cursor.updateRow)
+            for subsource, mig_issource, objectid_value in cursor:
+                relationship_exists = objectid_value in source_keys
                 if relationship_exists:
-                    row[1] = 1
+                    new_issource = 1
                 elif subsource == 1:
-                    row[1] = 2
+                    new_issource = 2
                 else:
-                    pass
+                    new_issource = mig_issource
                     #print(f"Processing without relationship check for GLOBALID {objectid_value} in {dest_fc}.")
-                cursor.updateRow(row)
-        edit.stopOperation()
-        edit.stopEditing(True)
-    except Exception as e:
-        edit.stopOperation()
-        edit.stopEditing(False)
-        print(f"Error during update: {e}")
-        raise
+                if new_issource != mig_issource:
+                    update((subsource, new_issource, objectid_value))
     print(f"Completion for {dest_fc}.")
 
 
 
+def ensure_attribute_index(fc, field):
+    """
+    Adds an attribute index on a field unless one already exists, so where clauses on the field are resolved by the index.
+    Parameters:
+    fc (str): Path to the feature class.
+    field (str): Name of the field to index.
+    """
+    for index in arcpy.ListIndexes(fc):
+        if [index_field.name.upper() for index_field in index.fields] == [field.upper()]:
+            return
+    arcpy.management.AddIndex(fc, [field], f"IDX_{field}"[:30])
+    print(f"Attribute index on '{field}' was added in {fc}.")
+
+
+def run_update_tasks(tasks):
+    """
+    Runs a group of update calls one after another. A group is the unit of work handed to a worker process.
+    Parameters:
+    tasks (list of tuples): Each tuple contains an update function and the tuple of its positional arguments.
+    """
+    for function, args in tasks:
+        function(*args)
+
+
+def run_in_edit_session(workspace, tasks):
+    """
+    Runs a group of update calls one after another inside one shared edit session, so their edits are saved in a single transaction.
+    Parameters:
+    workspace (str): Path to the geodatabase edited by the tasks.
+    tasks (list of tuples): Each tuple contains an update function and the tuple of its positional arguments.
+    """
+    with shared_editing_session(workspace):
+        run_update_tasks(tasks)
+
+
+def run_update_levels(levels, local_tasks=(), max_workers=4, executor_class=concurrent.futures.ProcessPoolExecutor):
+    """
+    Runs task groups level by level in an executor. Groups of the same level write to different feature classes and run in parallel;
+    a level starts only when the previous one has finished. Every task opens its own edit session, so each worker edits independently.
+    Parameters:
+    levels (list of lists): Each level is a list of task groups accepted by run_update_tasks.
+    local_tasks (list of tuples): Tasks that must run in this process (e.g. they use map layer names), run while the first level is processed.
+    max_workers (int): Maximum number of workers, default is 4.
+    executor_class (type): ProcessPoolExecutor (default) or ThreadPoolExecutor. Threads avoid process start-up and pickling, but
+                           geoprocessing tools are not thread-safe, so use them only when the groups are plain cursor updates.
+    """
+    with executor_class(max_workers=max_workers) as executor:
+        for level_number, level in enumerate(levels):
+            futures = [executor.submit(run_update_tasks, tasks) for tasks in level]
+            if level_number == 0:
+                run_update_tasks(local_tasks)
+            for future in concurrent.futures.as_completed(futures):
+                future.result()   # re-raises the first error as soon as its group fails
+
+
+@dataclasses.dataclass(frozen=True)
+class Job:
+    """
+    One attribute join of the migration: copies source fields into the target rows whose key matches.
+    Parameters:
+    target (str): Path to the destination feature class.
+    source (str): Path to the source feature class.
+    src_key (str): Key field in the source feature class.
+    tgt_key (str): Key field in the destination feature class.
+    pairs (list of tuples): List of field pairs (source field, destination field).
+    where (str): SQL where clause selecting the destination rows, default is "" (every row).
+    """
+    target: str
+    source: object
+    src_key: str
+    tgt_key: str
+    pairs: list
+    where: str = ""
+
+
+@dataclasses.dataclass(frozen=True)
+class Step:
+    """
+    One update call that is not an attribute join (self, spatial and MIG_ISSOURCE updates), scheduled together with the jobs.
+    Parameters:
+    targets (tuple): Paths to the feature classes the call writes.
+    function (callable): The update function.
+    args (tuple): Positional arguments of the function.
+    reads (tuple): Paths to feature classes the call reads values from that other jobs or steps write, and for local steps every
+                   feature class they join against, default is ().
+    before_jobs (bool): Run before the jobs of the same target instead of after them, default is False.
+    local (bool): Run in this process because the call uses map layers of the current project, default is False.
+    """
+    targets: tuple
+    function: object
+    args: tuple
+    reads: tuple = ()
+    before_jobs: bool = False
+    local: bool = False
+
+
+def _new_unit():
+    """
+    Returns an empty unit of work: the feature classes it writes and reads, and its tasks before, of and after the attribute jobs.
+    """
+    return {"writes": set(), "reads": set(), "before": [], "jobs": [], "after": []}
+
+
+def _schedule(jobs, steps):
+    """
+    Groups jobs and steps into units of work and returns the units level by level, as (a feature class the unit writes, its tasks),
+    and the local tasks.
+    Jobs on the same target are merged into one update_fc_multi call, and jobs that also share source, keys and where clause
+    into one join of it. A unit waits for every unit that writes a feature class it reads, and for the units declared before it
+    that write the same feature class, so the units of one level write different feature classes. Local steps run with the first level,
+    so the units that write a feature class they read wait for them instead.
+    Parameters:
+    jobs (list of Job): Attribute joins.
+    steps (list of Step): Other update calls.
+    """
+    joins_by_target = {}   # target -> {(source, source key, target key, where): field pairs}
+    for job in jobs:
+        joins = joins_by_target.setdefault(job.target, {})
+        joins.setdefault((job.source, job.src_key, job.tgt_key, job.where), []).extend(job.pairs)
+    local_unit = _new_unit()
+    units = [local_unit]   # first, so later writers of the feature classes it edits wait for it
+    target_units = {}
+    for target, joins in joins_by_target.items():
+        unit = target_units[target] = _new_unit()
+        join_list = []
+        for (source, src_key, tgt_key, where), pairs in joins.items():
+            join_list.append((source, src_key, tgt_key, pairs, where))
+            unit["reads"].add(source)
+        unit["writes"].add(target)
+        unit["jobs"].append((update_fc_multi, (target, join_list)))
+        units.append(unit)
+    for step in steps:
+        if step.local:
+            unit = local_unit
+        elif len(step.targets) == 1 and step.targets[0] in target_units:
+            unit = target_units[step.targets[0]]
+        else:
+            unit = _new_unit()
+            units.append(unit)
+        unit["before" if step.before_jobs else "after"].append((step.function, step.args))
+        unit["writes"].update(step.targets)
+        unit["reads"].update(step.reads)
+    unit_levels = {0: 0}
+
+    def level_of(position, pending=()):
+        if position not in unit_levels:
+            if position in pending:
+                raise ValueError("The jobs and steps depend on each other in a cycle.")
+            unit = units[position]
+            dependencies = [other for other, other_unit in enumerate(units) if other not in (0, position) and
+                            (other_unit["writes"] & unit["reads"] or (other < position and other_unit["writes"] & unit["writes"]))]
+            if local_unit["reads"] & unit["writes"] or local_unit["writes"] & (unit["reads"] | unit["writes"]):
+                dependencies.append(0)
+            unit_levels[position] = 1 + max((level_of(other, pending + (position,)) for other in dependencies), default=-1)
+        return unit_levels[position]
+    levels = [[] for _ in range(1 + max(level_of(position) for position in range(len(units))))]
+    for position, unit in enumerate(units[1:], start=1):
+        levels[unit_levels[position]].append((min(unit["writes"]), unit["before"] + unit["jobs"] + unit["after"]))
+    local_tasks = local_unit["before"] + local_unit["after"]
+    return levels, local_tasks
+
+
+def run(jobs, steps=(), max_workers=4, executor_class=concurrent.futures.ProcessPoolExecutor):
+    """
+    Runs the migration declared as jobs and steps: each target is scanned and written once per unit, the where clause columns of
+    the jobs are indexed, and the units of a level run in parallel workers. Units with several tasks share one edit session.
+    Parameters:
+    jobs (list of Job): Attribute joins.
+    steps (list of Step): Other update calls.
+    max_workers (int): Maximum number of workers, default is 4.
+    executor_class (type): Executor passed to run_update_levels, default is ProcessPoolExecutor.
+    """
+    levels, local_tasks = _schedule(jobs, steps)
+    # Indexing the filtered key columns lets the geodatabase skip the NULL rows instead of scanning them.
+    for target, field in dict.fromkeys((job.target, job.tgt_key) for job in jobs if job.where):
+        ensure_attribute_index(target, field)
+    levels = [[[(run_in_edit_session, (_workspace_of(fc), tasks))] if len(tasks) > 1 else tasks for fc, tasks in level] for level in levels]
+    run_update_levels(levels, local_tasks, max_workers, executor_class)
+
+
 def main():
+    # Attribute joins; run() merges the jobs on one target into a single scan of it.
+    jobs = []
+    # Other update calls; run() orders them with the jobs by the feature classes they read and write.
+    steps = []
+
 # BAY CLASS calculated by SWITCHINGFACILITY CLASS
-    switching_facility_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\SwitchingFacility"
-    bay_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Bay"
+    switching_facility_path = FC.SwitchingFacility
+    bay_path = FC.Bay
     field_pairs_bay = [("STATION_OID", "MIG_STATIONGUID"), ("OPERATINGVOLTAGE", "MIG_VOLTAGE")]
     where_clause_bay1 = "SWITCHINGFACILITY_OID IS NOT NULL"
-    update_fc_from_dict(switching_facility_path, bay_path, "OBJECTID", "SWITCHINGFACILITY_OID", field_pairs_bay, where_clause_bay1)
+    jobs.append(Job(target=bay_path, source=switching_facility_path, src_key="OBJECTID", tgt_key="SWITCHINGFACILITY_OID", pairs=field_pairs_bay, where=where_clause_bay1))
 
 
 # BAYSCHEME CLASS calculated by BAY CLASS
-    bay_scheme_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\BayScheme"
+    bay_scheme_path = FC.BayScheme
     field_pairs_bayscheme = [("MIG_STATIONGUID", "MIG_STATIONGUID")]
     where_clause_bay_scheme = "BAY_OID IS NOT NULL"
-    update_fc_from_dict(bay_path, bay_scheme_path, "OBJECTID", "BAY_OID", field_pairs_bayscheme, where_clause_bay_scheme)
-
+    jobs.append(Job(target=bay_scheme_path, source=bay_path, src_key="OBJECTID", tgt_key="BAY_OID", pairs=field_pairs_bayscheme, where=where_clause_bay_scheme))
 # BAYSCHEME CLASS inside STATIONSCHEME CLASS
-    station_scheme_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\StationScheme"
-    update_fc_within(bay_scheme_path, station_scheme_path)
+    station_scheme_path = FC.StationScheme
+    steps.append(Step(targets=(bay_scheme_path,), function=update_fc_within, args=(bay_scheme_path, station_scheme_path), reads=(station_scheme_path,)))
 
 
 # CIRCUIT_SOURCE CLASS calculated by ITSELF
-    circuit_source_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\CircuitSource"
+    circuit_source_path = FC.CircuitSource
     field_pairs_circuit_source = [('OBJECTID', 'MIG_OID', 'MIG_OID_TEXT'), ('GLOBALID', 'MIG_GLOBALID')]
-    update_fc_self(circuit_source_path, field_pairs_circuit_source)
+    steps.append(Step(targets=(circuit_source_path,), function=update_fc_self, args=(circuit_source_path, field_pairs_circuit_source)))
 
 
 # CircuitSourceID CLASS calculated by ITSELF
-    circuit_source_id_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\CircuitSourceID"
+    circuit_source_id_path = FC.CircuitSourceID
     field_pairs_circuit_source_id = [('OBJECTID', 'MIG_OID', 'MIG_OID_TEXT'), ('GLOBALID', 'MIG_GLOBALID')]
-    update_fc_self(circuit_source_id_path, field_pairs_circuit_source_id)
+    steps.append(Step(targets=(circuit_source_id_path,), function=update_fc_self, args=(circuit_source_id_path, field_pairs_circuit_source_id)))
 
 
 # Electric_NET_Junctions CLASS calculated by StationBoundary CLASS
-    electric_net_junctions_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Electric_Net_Junctions"
-    station_boundary_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\StationBoundary"
+    electric_net_junctions_path = FC.Electric_Net_Junctions
+    station_boundary_path = FC.StationBoundary
     station_oid = 'GLOBALID' 
     mig_stationguid_electric = 'MIG_STATIONGUID' 
-    update_point_fc_within_station_boundary(electric_net_junctions_path, station_boundary_path, 
-                                            station_oid, mig_stationguid_electric)
+    steps.append(Step(targets=(electric_net_junctions_path,), function=update_point_fc_within_station_boundary,
+                      args=(electric_net_junctions_path, station_boundary_path, station_oid, mig_stationguid_electric), reads=(station_boundary_path,), local=True))
 
 # Electric_NET_Junctions CLASS whether the junction is on a busbar, internal connecting line or a conductor
-    busbar_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Busbar"
-    conductor_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Conductor"
-    internal_connection_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\InternalConnection"
+    busbar_path = FC.Busbar
+    conductor_path = FC.Conductor
+    internal_connection_path = FC.InternalConnection
     mapping_el_net_junction = {busbar_path: "Busbar", conductor_path: "Conductor", internal_connection_path: "Internal Connection"}
     mig_parenttype = 'MIG_PARENTTYPE'
     objectid = 'OBJECTID'
-    update_field_based_on_whether_it_lies(electric_net_junctions_path, mapping_el_net_junction, mig_parenttype, objectid)
-    update_conductor_type(electric_net_junctions_path, conductor_path, mig_parenttype, 'SUBTYPE_CD')  
+    steps.append(Step(targets=(electric_net_junctions_path,), function=update_field_based_on_whether_it_lies,
+                      args=(electric_net_junctions_path, mapping_el_net_junction, mig_parenttype, objectid), reads=tuple(mapping_el_net_junction), local=True))
+    steps.append(Step(targets=(electric_net_junctions_path,), function=update_conductor_type,
+                      args=(electric_net_junctions_path, conductor_path, mig_parenttype, 'SUBTYPE_CD'), reads=(conductor_path,), local=True))
 
 # Electric_NET_Junctions CLASS Voltage calculated by Busbar/Conductor/InternalConnection CLASSES
-    join_internal = r"D:\UN\set_DB\set_DB.gdb\join_internal_layer"
-    join_conductor = r"D:\UN\set_DB\set_DB.gdb\join_conductor_layer"
-    join_busbar = r"D:\UN\set_DB\set_DB.gdb\join_busbar_layer"
-    update_mig_voltage(join_internal, join_conductor, join_busbar, electric_net_junctions_path)
+    join_internal = _temp_path("join_internal_layer")
+    join_conductor = _temp_path("join_conductor_layer")
+    join_busbar = _temp_path("join_busbar_layer")
+    steps.append(Step(targets=(electric_net_junctions_path,), function=update_mig_voltage,
+                      args=(join_internal, join_conductor, join_busbar, electric_net_junctions_path),
+                      reads=(internal_connection_path, conductor_path, busbar_path), local=True))   # the classes behind the map layers update_mig_voltage joins
 
 
 
 # BUSBAR CLASS calculated by SWITCHINGFACILITY CLASS
-    busbar_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Busbar"
     field_pairs_busbar = [("STATION_OID", "MIG_STATIONGUID")]
     where_clause_busbar = "SWITCHINGFACILITY_OID IS NOT NULL"
-    update_fc_from_dict(switching_facility_path, busbar_path, "OBJECTID", "SWITCHINGFACILITY_OID", field_pairs_busbar, where_clause_busbar)
-
+    jobs.append(Job(target=busbar_path, source=switching_facility_path, src_key="OBJECTID", tgt_key="SWITCHINGFACILITY_OID", pairs=field_pairs_busbar, where=where_clause_busbar))
 # BUSBAR CLASS inside STATIONSCHEME CLASS
-    station_scheme_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\StationScheme"
-    update_fc_within(busbar_path, station_scheme_path)
+    steps.append(Step(targets=(busbar_path,), function=update_fc_within, args=(busbar_path, station_scheme_path), reads=(station_scheme_path,)))
 
 
 
 # CIRCUITBREAKER CLASS calculated by itself (+Circuit_Source CLASS)
-    circuit_breaker_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\CircuitBreaker"
+    circuit_breaker_path = FC.CircuitBreaker
     fields = ["SUBSOURCE", "MIG_ISSOURCE", "OBJECTID"]
     objectid_circiut_breaker = "CIRCUITBREAKER_OID"
-    update_mig_issource(circuit_breaker_path, circuit_source_path, objectid_circiut_breaker, fields=fields)
-
+    steps.append(Step(targets=(circuit_breaker_path,), function=update_mig_issource, args=(circuit_breaker_path, circuit_source_path, objectid_circiut_breaker, fields),
+                      reads=(circuit_source_path,), before_jobs=True))
 # CIRCUITBREAKER calculated by CIRCUITSOURCEID CLASS
     field_pairs_circuit_breaker = [("FEEDERID", "MIG_FEEDERID")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source_path, circuit_breaker_path, "MIG_OID",  "OBJECTID",  field_pairs_circuit_breaker, where_clause)
-
 # CIRCUITBREAKER calculated by CIRCUITSOURCEID CLASS
     field_pairs_circuit_breaker2 = [("FEEDERNAME", "MIG_FEEDERNAME")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source_id_path, circuit_breaker_path,
-                        "MIG_OID",  # or SUBSTATIONID
-                        "OBJECTID", field_pairs_circuit_breaker2, where_clause)
-
+    jobs.append(Job(target=circuit_breaker_path, source=circuit_source_path, src_key="MIG_OID", tgt_key="OBJECTID", pairs=field_pairs_circuit_breaker))
+    jobs.append(Job(target=circuit_breaker_path, source=circuit_source_id_path, src_key="MIG_OID", tgt_key="OBJECTID", pairs=field_pairs_circuit_breaker2))   # "MIG_OID" or SUBSTATIONID
 # CIRCUITBREAKER CLASS calculated by BAY CLASS
     field_pairs_circuit_breaker3 = [("STATION_OID", "MIG_STATIONGUID")]   #[("MIG_STATIONGUID", "MIG_STATIONGUID")]
     where_clause_circuit_breaker = "SWITCHINGFACILITY_OID IS NOT NULL"    #"BAY_GUID IS NOT NULL"
-    update_fc_from_dict(switching_facility_path, circuit_breaker_path, "OBJECTID", "SWITCHINGFACILITY_OID", field_pairs_circuit_breaker3, where_clause_circuit_breaker) #(bay_path, circuit_breaker_path,"GLOBALID", "BAY_GUID",
+    jobs.append(Job(target=circuit_breaker_path, source=switching_facility_path, src_key="OBJECTID", tgt_key="SWITCHINGFACILITY_OID",   #(bay_path, circuit_breaker_path,"GLOBALID", "BAY_GUID",
+                    pairs=field_pairs_circuit_breaker3, where=where_clause_circuit_breaker))
 
 
 # DISCONNECTOR CLASS calculated by itself (+Circuit_Source CLASS)
-    disconnector_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Disconnector"
-    circuit_source_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\CircuitSource"
+    disconnector_path = FC.Disconnector
     objectid_disconnetor = "DISCONNECTOR_OID"
-    fields = ["SUBSOURCE", "MIG_ISSOURCE", "OBJECTID"]
-    update_mig_issource(disconnector_path, circuit_source_path, objectid_disconnetor, fields=fields)
-
+    steps.append(Step(targets=(disconnector_path,), function=update_mig_issource, args=(disconnector_path, circuit_source_path, objectid_disconnetor, fields),
+                      reads=(circuit_source_path,), before_jobs=True))
 # DISCONNECTOR CLASS calculated by CIRCUITSOURCE CLASS
-    circuit_source = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\CircuitSource"
     field_pairs_disconnector1 = [("FEEDERID", "MIG_FEEDERID")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source, disconnector_path, "MIG_OID",  "OBJECTID",  field_pairs_disconnector1, where_clause)
-
 # DISCONNECTOR CLASS calculated by CIRCUITSOURCEID CLASS
-    circuit_source_id = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\CircuitSourceID"
     field_pairs_disconnector2 = [("FEEDERNAME", "MIG_FEEDERNAME")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source_id, disconnector_path,
-                        "MIG_OID",  # or SUBSTATIONID
-                        "OBJECTID", field_pairs_disconnector2, where_clause)
-    
+    jobs.append(Job(target=disconnector_path, source=circuit_source_path, src_key="MIG_OID", tgt_key="OBJECTID", pairs=field_pairs_disconnector1))
+    jobs.append(Job(target=disconnector_path, source=circuit_source_id_path, src_key="MIG_OID", tgt_key="OBJECTID", pairs=field_pairs_disconnector2))   # "MIG_OID" or SUBSTATIONID
 # DISCONNECTOR CLASS calculated by BAY CLASS
     field_pairs_disconnector3 = [("STATION_OID", "MIG_STATIONGUID")]   #[("MIG_STATIONGUID", "MIG_STATIONGUID")]
     where_clause_disconnector = "SWITCHINGFACILITY_OID IS NOT NULL"     #"BAY_OID IS NOT NULL"
-    update_fc_from_dict(switching_facility_path,disconnector_path,"OBJECTID", "SWITCHINGFACILITY_OID", field_pairs_disconnector3, where_clause_disconnector) #"GLOBALID", "BAY_GUID",
+    jobs.append(Job(target=disconnector_path, source=switching_facility_path, src_key="OBJECTID", tgt_key="SWITCHINGFACILITY_OID",   #"GLOBALID", "BAY_GUID",
+                    pairs=field_pairs_disconnector3, where=where_clause_disconnector))
     
 
 # FaultIndicator CLASS calculated by CONDUCTOR CLASS
     join_internal_connection = None
-    join_conductor = r"D:\UN\set_DB\set_DB.gdb\join_conductor_layer"
+    join_fault_indicator_conductor = _temp_path("join_fault_indicator_conductor_layer")
     join_busbar = None 
-    fault_indicator_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\FaultIndicator"
-    update_mig_voltage(join_internal_connection, join_conductor, join_busbar, fault_indicator_path)
+    fault_indicator_path = FC.FaultIndicator
+    steps.append(Step(targets=(fault_indicator_path,), function=update_mig_voltage,
+                      args=(join_internal_connection, join_fault_indicator_conductor, join_busbar, fault_indicator_path), reads=(conductor_path,), local=True))
 
 # FAULTINDICATOR CLASS calculated by Station
-    station_boundary_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\StationBoundary"
-    station_oid = 'GLOBALID' 
     mig_stationguid_interal_con = 'MIG_STATIONGUID' 
-    update_line_fc_within_station_boundary(fault_indicator_path, station_boundary_path, station_oid, mig_stationguid_interal_con)
+    # The station polygons are read once here and handed to both line classes instead of being read again in each worker.
+    station_shapes = {station_global_id: polygon.JSON for station_global_id, polygon in _station_polygons(station_boundary_path, station_oid).items()}
+    update_lines_within_station = functools.partial(update_line_fc_within_station_boundary, station_shapes=station_shapes)
+    steps.append(Step(targets=(fault_indicator_path,), function=update_lines_within_station,
+                      args=(fault_indicator_path, station_boundary_path, station_oid, mig_stationguid_interal_con)))
 
 # FUSE CLASS calculated by itself (+Circuit_Source CLASS)
-    fuse_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Fuse"
-    #circuit_source_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\CircuitSource"
+    fuse_path = FC.Fuse
     #objectid_fuse = "FUSE_OID"
-    #fields = ["SUBSOURCE", "MIG_ISSOURCE", "OBJECTID"]
     #update_mig_issource(fuse_path, circuit_source_path,objectid_fuse, fields=fields)    няма в БГ поле subsource
 
 # FUSE CLASS calculated by CIRCUITSOURCE CLASS
-    circuit_source_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\CircuitSource"
     field_pairs_fuse1 = [("FEEDERID", "MIG_FEEDERID")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source_path, fuse_path,
-                        "MIG_OID", "OBJECTID",  
-                        field_pairs_fuse1, where_clause)
-
 # FUSE CLASS calculated by CIRCUITSOURCEID CLASS
-    circuit_source_id = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\CircuitSourceID"
     field_pairs_fuse2 = [("FEEDERNAME", "MIG_FEEDERNAME")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source_id, fuse_path,
-                    "MIG_OID",  # or SUBSTATIONID
-                    "OBJECTID",  field_pairs_fuse2, where_clause)
-
+    jobs.append(Job(target=fuse_path, source=circuit_source_path, src_key="MIG_OID", tgt_key="OBJECTID", pairs=field_pairs_fuse1))
+    jobs.append(Job(target=fuse_path, source=circuit_source_id_path, src_key="MIG_OID", tgt_key="OBJECTID", pairs=field_pairs_fuse2))   # "MIG_OID" or SUBSTATIONID
 # FUSE CLASS calculated by BAY CLASS
     field_pairs_fuse3 = [("STATION_OID", "MIG_STATIONGUID")]   #[("MIG_STATIONGUID", "MIG_STATIONGUID")]
     where_clause_fuse = "SWITCHINGFACILITY_OID IS NOT NULL"     #"BAY_OID IS NOT NULL"
-    update_fc_from_dict(switching_facility_path,fuse_path,"OBJECTID", "SWITCHINGFACILITY_OID", field_pairs_fuse3, where_clause_fuse) #"GLOBALID", "BAY_GUID",
+    jobs.append(Job(target=fuse_path, source=switching_facility_path, src_key="OBJECTID", tgt_key="SWITCHINGFACILITY_OID",   #"GLOBALID", "BAY_GUID",
+                    pairs=field_pairs_fuse3, where=where_clause_fuse))
 
 
 # INTERNALCONNECTION CLASS calculated by Station
-    internal_connection_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\InternalConnection"
-    station_boundary_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\StationBoundary"
-    station_oid = 'GLOBALID' 
-    mig_stationguid_interal_con = 'MIG_STATIONGUID' 
-    update_line_fc_within_station_boundary(internal_connection_path, station_boundary_path, station_oid, mig_stationguid_interal_con)
+    steps.append(Step(targets=(internal_connection_path,), function=update_lines_within_station,
+                      args=(internal_connection_path, station_boundary_path, station_oid, mig_stationguid_interal_con)))
 
 
 # LOADBREAK_SWITCH CLASS calculated by itself (+Circuit_Source CLASS)
-    loadbreak_switch_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\LoadBreakSwitch"
+    loadbreak_switch_path = FC.LoadBreakSwitch
     objectid_load_break = "LOADBREAKSWTICH_OID"
-    fields = ["SUBSOURCE", "MIG_ISSOURCE", "OBJECTID"]
-    update_mig_issource(loadbreak_switch_path, circuit_source_path, objectid_load_break, fields=fields)
-
+    steps.append(Step(targets=(loadbreak_switch_path,), function=update_mig_issource, args=(loadbreak_switch_path, circuit_source_path, objectid_load_break, fields),
+                      reads=(circuit_source_path,), before_jobs=True))
 # LOADBREAK_SWITCH CLASS calculated by CIRCUITSOURCE CLASS
     field_pairs_loak_break1 = [("FEEDERID", "MIG_FEEDERID")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source_path, loadbreak_switch_path, "MIG_OID",  "OBJECTID",  field_pairs_loak_break1, where_clause)
-
 # LOADBREAK_SWITCH CLASS calculated by CIRCUITSOURCEID CLASS
     field_pairs_loak_break2 = [("FEEDERNAME", "MIG_FEEDERNAME")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source_id_path, loadbreak_switch_path,
-                        "MIG_OID",  # or SUBSTATIONID
-                        "OBJECTID", field_pairs_loak_break2, where_clause)
-
+    jobs.append(Job(target=loadbreak_switch_path, source=circuit_source_path, src_key="MIG_OID", tgt_key="OBJECTID", pairs=field_pairs_loak_break1))
+    jobs.append(Job(target=loadbreak_switch_path, source=circuit_source_id_path, src_key="MIG_OID", tgt_key="OBJECTID", pairs=field_pairs_loak_break2))   # "MIG_OID" or SUBSTATIONID
 # LOADBREAK_SWITCH CLASS calculated by BAY CLASS
     field_pairs_loak_break3 = [("STATION_OID", "MIG_STATIONGUID")]   #[("MIG_STATIONGUID", "MIG_STATIONGUID")]
     where_clause_load_break = "SWITCHINGFACILITY_OID IS NOT NULL"     #"BAY_OID IS NOT NULL"
-    update_fc_from_dict(switching_facility_path,loadbreak_switch_path,"OBJECTID", "SWITCHINGFACILITY_OID", field_pairs_loak_break3, where_clause_load_break) #"GLOBALID", "BAY_GUID",
+    jobs.append(Job(target=loadbreak_switch_path, source=switching_facility_path, src_key="OBJECTID", tgt_key="SWITCHINGFACILITY_OID",   #"GLOBALID", "BAY_GUID",
+                    pairs=field_pairs_loak_break3, where=where_clause_load_break))
     
 
 # MEASUREMENTTRANSFORMER CLASS calculated by Station
-    measurement_transformer_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\MeasurementTransformer"
-    station_oid = 'GLOBALID' 
-    mig_stationguid_electric = 'MIG_STATIONGUID' 
-    update_point_fc_within_station_boundary(measurement_transformer_path, station_boundary_path, station_oid, mig_stationguid_electric)
+    measurement_transformer_path = FC.MeasurementTransformer
+    steps.append(Step(targets=(measurement_transformer_path,), function=update_point_fc_within_station_boundary,
+                      args=(measurement_transformer_path, station_boundary_path, station_oid, mig_stationguid_electric)))
 
 
 
 # STATION_EQUIPMENT CLASS calculated by STATION CLASS
-    station_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Station"
-    station_equipment_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\StationEquipment"
+    station_path = FC.Station
+    station_equipment_path = FC.StationEquipment
     field_pairs_station = [("OPERATINGVOLTAGE", "MIG_VOLTAGE")]
     where_clause_station_equipment = "STATION_OID IS NOT NULL"
-    update_fc_from_dict(station_path,station_equipment_path,"OBJECTID","STATION_OID",field_pairs_station,where_clause_station_equipment)
+    jobs.append(Job(target=station_equipment_path, source=station_path, src_key="OBJECTID", tgt_key="STATION_OID", pairs=field_pairs_station, where=where_clause_station_equipment))
 
 
 # TRANSFORMER CLASS calculated by BAY CLASS
-    transformer_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Transformer"
+    transformer_path = FC.Transformer
     field_pairs_transformer = [("OBJECTID", "MIG_STATIONGUID")]
     where_clause_transformer = "STATION_OID IS NOT NULL"
-    update_fc_from_dict(station_path,transformer_path, "OBJECTID", "STATION_OID", field_pairs_transformer, where_clause_transformer)
+    jobs.append(Job(target=transformer_path, source=station_path, src_key="OBJECTID", tgt_key="STATION_OID", pairs=field_pairs_transformer, where=where_clause_transformer))
 
 
 # TRANSFORMER_UNIT CLASS calculated by TRANSFORMER CLASS
-    transformer_unit_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\TransformerUnit"
+    transformer_unit_path = FC.TransformerUnit
     field_pairs_tran_unit = [("STATION_OID", "MIG_STATIONGUID")]
     where_clause_transformer_unit = "TRANSFORMER_OID IS NOT NULL"
-    update_fc_from_dict(transformer_path,  transformer_unit_path,  "OBJECTID",  "TRANSFORMER_OID",   field_pairs_tran_unit,   where_clause_transformer_unit)
+    jobs.append(Job(target=transformer_unit_path, source=transformer_path, src_key="OBJECTID", tgt_key="TRANSFORMER_OID", pairs=field_pairs_tran_unit, where=where_clause_transformer_unit))
 
-    
+    # BayScheme needs Bay, TransformerUnit needs Transformer and the FEEDERID/FEEDERNAME lookups need the MIG_OID written to
+    # CircuitSource/CircuitSourceID, so run() puts them in a later level than the units they read from.
+    run(jobs, steps)
     print("Update completed successfully.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
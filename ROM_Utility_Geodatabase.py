@@ -1,36 +1,130 @@
+import collections
+import concurrent.futures
+import dataclasses
+import functools
+import logging
+import uuid
+
 import arcpy
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SQL_IN_CHUNK_SIZE = 999          # maximum number of values in one SQL IN (...) list
+MAX_PUSHDOWN_KEYS = 20000        # above this many destination keys a full source scan is cheaper than chunked IN queries
+EMPTY_VALUES = frozenset([None, '', 0])   # values that do not count as existing data in update_fc_self
+VOLTAGE_LAYERS = [r"Details\InternalConnection", "Conductor", r"Details\Busbar"]   # map layers read by update_mig_voltage, lowest priority first
 
-def update_fc_from_dict(source_fc, destination_fc, source_key_field, destination_key_field, field_pairs, where_clause):
+
+@functools.lru_cache(maxsize=None)
+def _workspace_of(fc):
     """
-    Update fields in a destination feature class based on values from a source feature class.
+    Returns the workspace of a feature class, cached per path, for opening edit sessions.
+    Parameters:
+    fc (str): Path to the feature class.
+    """
+    return arcpy.Describe(fc).path
+
+
+def _temp_path(name):
+    """
+    Returns a unique path in the memory workspace for an intermediate output, so concurrent calls do not collide.
+    Parameters:
+    name (str): Base name of the intermediate output.
+    """
+    return f"memory\\{name}_{uuid.uuid4().hex}"
+
+
+def _sql_in_clauses(fc, field, values, chunk_size=SQL_IN_CHUNK_SIZE):
+    """
+    Yields where clauses of the form "field IN (...)" that together select all given values.
+    Parameters:
+    fc (str): Path to the feature class the clauses are used on.
+    field (str): Name of the field to filter.
+    values (iterable): Values to select; None values are skipped.
+    chunk_size (int): Maximum number of values per clause, default is SQL_IN_CHUNK_SIZE.
+    """
+    delimited_field = arcpy.AddFieldDelimiters(fc, field)
+    literals = []
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, str):
+            literals.append("'" + value.replace("'", "''") + "'")
+        else:
+            literals.append(str(value))
+    for start in range(0, len(literals), chunk_size):
+        yield f"{delimited_field} IN ({','.join(literals[start:start + chunk_size])})"
+
+
+def _build_dict(source_fc, source_key_field, source_fields):
+    """
+    Reads a source feature class once into a dictionary of key to the tuple of source field values, for update_fc_from_dict calls that share it.
     Parameters:
     source_fc (str): Path to the source feature class.
+    source_key_field (str): Key field in the source feature class.
+    source_fields (list): Source fields, in the order of the field pairs passed to update_fc_from_dict.
+    """
+    source_dict = {}
+    with arcpy.da.SearchCursor(source_fc, [source_key_field] + list(source_fields)) as cursor:
+        for row in cursor:
+            if row[0] is not None:
+                source_dict[row[0]] = row[1:]
+    return source_dict
+
+
+def update_fc_from_dict(source_fc, destination_fc, source_key_field, destination_key_field, field_pairs, where_clause, source_where_clause=None):
+    """
+    Update fields in a destination feature class based on values from a source feature class.
+    Parameters:
+    source_fc (str or dict): Path to the source feature class, or a dictionary built by _build_dict for the same key field and source fields.
     destination_fc (str): Path to the destination feature class.
     source_key_field (str): Key field in the source feature class.
     destination_key_field (str): Key field in the destination feature class.
     field_pairs (list of tuples): List of field pairs (source field, destination field).
     where_clause (str): SQL where clause for filtering records.
+    source_where_clause (str, optional): SQL where clause limiting the source rows that are read.
     """
     source_fields = [pair[0] for pair in field_pairs]
     destination_fields = [pair[1] for pair in field_pairs]
-    fields_to_retrieve = [source_key_field] + source_fields
-    origin_fc_dict = {}
-    with arcpy.da.SearchCursor(source_fc, fields_to_retrieve) as cursor:
-        for row in cursor:
-            key = row[0]
-            origin_fc_dict[key] = {source_fields[i]: row[i + 1] for i in range(len(source_fields))}
-    fields_to_update = [destination_key_field] + destination_fields
-    with arcpy.da.UpdateCursor(destination_fc, fields_to_update, where_clause) as cursor:
+    # Columns are renamed by position because source and destination fields often share a name; object dtype keeps NULLs as None.
+    source_columns = [f"source_{i}" for i in range(len(field_pairs))]
+    destination_columns = [f"destination_{i}" for i in range(len(field_pairs))]
+    fields_to_update = ['OID@', destination_key_field] + destination_fields
+    with arcpy.da.SearchCursor(destination_fc, fields_to_update, where_clause) as cursor:
+        destination_df = pd.DataFrame(list(cursor), columns=["oid", "key"] + destination_columns, dtype=object)
+    # A filtered destination usually references few source rows, so only those keys are read when there are not too many of them.
+    needed_keys = set(destination_df["key"].dropna())
+    if not needed_keys:
+        return
+    if isinstance(source_fc, dict):
+        source_rows = [(key,) + values for key, values in source_fc.items() if key in needed_keys]
+    else:
+        source_where_clauses = [source_where_clause]
+        if len(needed_keys) <= MAX_PUSHDOWN_KEYS:
+            source_where_clauses = [in_clause if not source_where_clause else f"({source_where_clause}) AND ({in_clause})"
+                                    for in_clause in _sql_in_clauses(source_fc, source_key_field, needed_keys)]
+        fields_to_retrieve = [source_key_field] + source_fields
+        source_rows = []
+        for source_where in source_where_clauses:
+            with arcpy.da.SearchCursor(source_fc, fields_to_retrieve, source_where) as cursor:
+                source_rows.extend(cursor)
+    source_df = pd.DataFrame(source_rows, columns=["key"] + source_columns, dtype=object)
+    source_df = source_df.dropna(subset=["key"]).drop_duplicates("key", keep="last")
+    # The inner merge keeps only destination rows with related data, so rows with a NULL or unknown key are left untouched.
+    merged = destination_df.merge(source_df, on="key", how="inner")
+    new_values = merged[source_columns].set_axis(destination_columns, axis=1)
+    old_values = merged[destination_columns]
+    changed = (new_values.ne(old_values) & ~(new_values.isna() & old_values.isna())).any(axis=1)
+    # OID -> complete flat row to write, built once here so the update loop does a single lookup per row
+    rows_to_write = {row[0]: row for row in merged.loc[changed, ["oid"] + source_columns].itertuples(index=False, name=None)}
+    if not rows_to_write:
+        return
+    with arcpy.da.Editor(_workspace_of(destination_fc)), arcpy.da.UpdateCursor(destination_fc, ['OID@'] + destination_fields, where_clause) as cursor:
         for row in cursor:
-            common_guid = row[0]
-            if common_guid in origin_fc_dict:
-                related_data = origin_fc_dict[common_guid]
-                for i in range(len(destination_fields)):
-                    row[i+1] = related_data[field_pairs[i][0]]
-                cursor.updateRow(row)
-            else:
-                pass
-                #arcpy.AddWarning(f"No related data found in feature class {source_fc} with key value {common_guid} from the destination feature class {destination_fc}")
+            new_row = rows_to_write.get(row[0])
+            if new_row is not None:
+                cursor.updateRow(new_row)
 
 def update_fc_within(inner_fc, outer_fc):
     """
@@ -39,14 +133,34 @@ def update_fc_within(inner_fc, outer_fc):
     inner_fc (str): Path to the inner feature class.
     outer_fc (str): Path to the outer feature class.
     """
-    outer_polygons = [row[0] for row in arcpy.da.SearchCursor(outer_fc, 'SHAPE@')]
-    with arcpy.da.UpdateCursor(inner_fc, ['SHAPE@', 'MIG_PARENTTYPE']) as cursor:
-        for row in cursor:
-            inner_polygon = row[0]
-            within_outer = any(inner_polygon.within(outer) for outer in outer_polygons)
-            if within_outer:
-                row[1] = 'Station'
-                cursor.updateRow(row)
+    # The spatial join uses the spatial index of the outer feature class, so each inner polygon is only tested against nearby outer polygons.
+    temp_join = _temp_path("within_join")
+    arcpy.analysis.SpatialJoin(target_features=inner_fc, join_features=outer_fc, out_feature_class=temp_join, join_operation="JOIN_ONE_TO_ONE",
+                               join_type="KEEP_COMMON", field_mapping=None, match_option="WITHIN", search_radius=None, distance_field_name=None)
+    try:
+        inner_within_outer = {row[0] for row in arcpy.da.SearchCursor(temp_join, ['TARGET_FID'])}
+        with arcpy.da.Editor(_workspace_of(inner_fc)), arcpy.da.UpdateCursor(inner_fc, ['OID@', 'MIG_PARENTTYPE']) as cursor:
+            for row in cursor:
+                if row[0] in inner_within_outer:
+                    row[1] = 'Station'
+                    cursor.updateRow(row)
+    finally:
+        _delete_temp(temp_join)
+
+
+def _delete_temp(*temp_fcs):
+    """
+    Deletes temporary feature classes that exist. A failed delete is reported but does not hide an earlier error.
+    Parameters:
+    temp_fcs (str): Paths of the temporary feature classes, e.g. in the memory workspace.
+    """
+    for temp_fc in temp_fcs:
+        try:
+            if arcpy.Exists(temp_fc):
+                arcpy.management.Delete(temp_fc)
+        except arcpy.ExecuteError as e:
+            print(f"Could not delete the temporary feature class {temp_fc}: {e}")
+
 
 def update_fc_self(source_fc, field_updates):
     """
@@ -55,82 +169,82 @@ def update_fc_self(source_fc, field_updates):
     source_fc (str): Path to the feature class.
     field_updates (list of tuples): Each tuple contains the original field and the new fields to populate.
     """
-    fields = [item for sublist in field_updates for item in sublist]
-    fields_populated = {field: False for field in fields}
-    with arcpy.da.UpdateCursor(source_fc, fields) as cursor:
+    target_fields = [target_field for update_sub_tuple in field_updates for target_field in update_sub_tuple[1:]]
+    unchecked_fields = set(target_fields)
+    with arcpy.da.SearchCursor(source_fc, target_fields) as cursor:
         for row in cursor:
-            for update_sub_tuple in field_updates:
-                source_field = update_sub_tuple[0]
-                source_index = fields.index(source_field)
-                source_value = row[source_index]
-                for each_target_field in update_sub_tuple[1:]:
-                    target_index = fields.index(each_target_field)
-                    if row[target_index] not in [None, '', 0]:
-                        if not fields_populated[each_target_field]:
-                            print(f"The field '{each_target_field}' in the feature class {source_fc} already contains data. Any existing data will be overwritten.")
-                            fields_populated[each_target_field] = True
-                    if 'TEXT' in each_target_field:
-                        row[target_index] = str(source_value)
-                    else:
-                        row[target_index] = source_value
-            cursor.updateRow(row)
-    print("Self-update completed successfully.")
+            for target_field, value in zip(target_fields, row):
+                if value not in EMPTY_VALUES and target_field in unchecked_fields:
+                    logger.warning("The field '%s' in the feature class %s already contains data. Any existing data will be overwritten.", target_field, source_fc)
+                    unchecked_fields.discard(target_field)
+            if not unchecked_fields:
+                break
+    field_expressions = []
+    for update_sub_tuple in field_updates:
+        source_field = update_sub_tuple[0]
+        for each_target_field in update_sub_tuple[1:]:
+            if 'TEXT' in each_target_field:
+                field_expressions.append([each_target_field, f"str(!{source_field}!)"])
+            else:
+                field_expressions.append([each_target_field, f"!{source_field}!"])
+    # One column-wise calculation inside the geodatabase engine instead of a Python loop over every row.
+    arcpy.management.CalculateFields(source_fc, "PYTHON3", field_expressions)
+    logger.info("Self-update completed successfully.")
 
 
-def update_mig_voltage(join_internal, join_conductor, join_busbar, dest_fc):
+def update_mig_voltage(dest_fc, voltage_layers=VOLTAGE_LAYERS):
     """
-    Updates the MIG_VOLTAGE field in the destination feature class based on spatial joins with InternalConnection, Conductor, and Busbar feature classes.
+    Updates the MIG_VOLTAGE field in the destination feature class based on one spatial join with the merged InternalConnection, Conductor, and Busbar features.
+    Each feature takes the voltage of the highest-priority layer it intersects.
     Parameters:
-    join_internal (str): Path to the feature layer resulting from the spatial join between Connector and InternalConnection.
-    join_conductor (str): Path to the feature layer resulting from the spatial join between Connector and Conductor.
-    join_busbar (str): Path to the feature layer resulting from the spatial join between Connector and Busbar.
     dest_fc (str): Path to the destination feature class where the MIG_VOLTAGE field will be updated.
+    voltage_layers (list): Map layers with an OPERATINGVOLTAGE field, from the lowest to the highest priority, default is VOLTAGE_LAYERS.
     """
-    def update_field(source_fc, destination_fc, source_globalid, operatingvoltage, dest_globalid, mig_voltage):
-        """
-        Updates the destination feature class field with values from the source feature class field.
-        Parameters:
-        source_fc (str): Path to the source feature class containing the original voltage data.
-        destination_fc (str): Path to the destination feature class where the voltage data will be updated.
-        source_globalid (str): Name of the GlobalID field in the source feature class.
-        operatingvoltage (str): Name of the operating voltage field in the source feature class.
-        dest_globalid (str): Name of the GlobalID field in the destination feature class.
-        mig_voltage (str): Name of the field in the destination feature class to update with the migrated voltage.
-        """
-        fields_to_retrieve = [source_globalid, operatingvoltage]
-        origin_fc_dict = {}
-        with arcpy.da.SearchCursor(source_fc, fields_to_retrieve) as cursor:
+    merged_layers = _temp_path("merged_voltage_layers")
+    join_all = _temp_path("join_voltage_layer")
+    voltage_map = arcpy.FieldMap()
+    for layer in voltage_layers:
+        voltage_map.addInputField(layer, "OPERATINGVOLTAGE")
+    merge_mappings = arcpy.FieldMappings()
+    merge_mappings.addFieldMap(voltage_map)
+    try:
+        # MERGE_SRC records the input each merged feature comes from, which gives its priority.
+        arcpy.management.Merge(voltage_layers, merged_layers, merge_mappings, "ADD_SOURCE_INFO")
+        priorities = {}
+        for priority, layer in enumerate(voltage_layers):
+            for name in (layer, layer.split("\\")[-1], arcpy.Describe(layer).catalogPath):
+                priorities[name] = priority
+        join_mappings = arcpy.FieldMappings()
+        for field, output_name in [("OPERATINGVOLTAGE", "JOIN_VOLTAGE"), ("MERGE_SRC", "JOIN_SOURCE")]:
+            field_map = arcpy.FieldMap()
+            field_map.addInputField(merged_layers, field)
+            output_field = field_map.outputField
+            output_field.name = output_name
+            output_field.aliasName = output_name
+            field_map.outputField = output_field
+            join_mappings.addFieldMap(field_map)
+        arcpy.analysis.SpatialJoin(dest_fc, merged_layers, join_all, "JOIN_ONE_TO_MANY", "KEEP_COMMON", join_mappings, "INTERSECT")
+        with arcpy.da.SearchCursor(join_all, ['TARGET_FID', 'JOIN_FID', 'JOIN_VOLTAGE', 'JOIN_SOURCE']) as cursor:
+            matches = sorted(cursor, key=lambda match: match[1])
+        # priority: busbar > conductor > internalconnection; within a layer the first intersecting feature with a voltage wins
+        voltage_by_oid = {}   # OID -> (priority, voltage)
+        for target_fid, _, voltage, source in matches:
+            if not voltage:
+                continue
+            priority = priorities.get(source)
+            if priority is None:
+                raise ValueError(f"The merged feature source '{source}' is not one of {voltage_layers}.")
+            if target_fid not in voltage_by_oid or priority > voltage_by_oid[target_fid][0]:
+                voltage_by_oid[target_fid] = (priority, voltage)
+        # One pass over the destination writes each row once with its highest-priority voltage.
+        with arcpy.da.Editor(_workspace_of(dest_fc)), arcpy.da.UpdateCursor(dest_fc, ['OID@', "MIG_VOLTAGE"]) as cursor:
             for row in cursor:
-                key = row[0]
-                voltage = row[1]
-                if key and voltage:
-                    origin_fc_dict[key] = voltage
-        with arcpy.da.UpdateCursor(destination_fc, [dest_globalid, mig_voltage]) as cursor:
-            for row in cursor:
-                common_guid = row[0]
-                if common_guid in origin_fc_dict:
-                    row[1] = origin_fc_dict[common_guid]
+                match = voltage_by_oid.get(row[0])
+                if match is not None and match[1] != row[1]:
+                    row[1] = match[1]
                     cursor.updateRow(row)
-    arcpy.analysis.SpatialJoin(dest_fc, r"Details\InternalConnection", join_internal, 
-                               "JOIN_ONE_TO_ONE", "KEEP_COMMON", 
-                               r'GLOBALID "GLOBALID" true true false 38 Guid 0 0,First,#,Details\Connector,GLOBALID,-1,-1;OPERATINGVOLTAGE_1 "OPERATINGVOLTAGE" true true false 255 Text 0 0,First,#,Details\InternalConnection,OPERATINGVOLTAGE,0,255', 
-                               "INTERSECT", None, '')
-    arcpy.analysis.SpatialJoin(dest_fc, "Conductor", join_conductor, 
-                               "JOIN_ONE_TO_ONE", "KEEP_COMMON", 
-                               r'GLOBALID "GLOBALID" true true false 38 Guid 0 0,First,#,Details\Connector,GLOBALID,-1,-1;OPERATINGVOLTAGE_1 "OPERATINGVOLTAGE" true true false 255 Text 0 0,First,#,Conductor,OPERATINGVOLTAGE,0,255', 
-                               "INTERSECT", None, '')
-    arcpy.analysis.SpatialJoin(dest_fc, r"Details\Busbar", join_busbar, 
-                               "JOIN_ONE_TO_ONE", "KEEP_COMMON", 
-                               r'GLOBALID "GLOBALID" true true false 38 Guid 0 0,First,#,Details\Connector,GLOBALID,-1,-1;OPERATINGVOLTAGE_1 "OPERATINGVOLTAGE" true true false 255 Text 0 0,First,#,Details\Busbar,OPERATINGVOLTAGE,0,255', 
-                               "INTERSECT", None, '')
-    # priority: busbar > conductor > internalconnection
-    update_field(join_internal, dest_fc, "GLOBALID", "OPERATINGVOLTAGE_1", "NewGUID", "MIG_VOLTAGE")    #"OPERATINGVOLTAGE" === "OPERATINGVOLTAGE_1";  #NewGUID === "GLOBALID"
-    update_field(join_conductor, dest_fc, "GLOBALID", "OPERATINGVOLTAGE_1", "NewGUID", "MIG_VOLTAGE")   #"OPERATINGVOLTAGE" === "OPERATINGVOLTAGE_1";  #NewGUID === "GLOBALID"
-    update_field(join_busbar, dest_fc, "GLOBALID", "OPERATINGVOLTAGE_1", "NewGUID", "MIG_VOLTAGE")      #"OPERATINGVOLTAGE" === "OPERATINGVOLTAGE_1";  #NewGUID === "GLOBALID"
-    arcpy.management.Delete(join_internal)
-    arcpy.management.Delete(join_conductor)
-    arcpy.management.Delete(join_busbar)
-    #print("MIG_VOLTAGE field updated successfully.")
+    finally:
+        _delete_temp(merged_layers, join_all)
 
 
 def update_field_based_on_whether_it_lies(target_fc, mapping_layers, mig_parenttype, objectid):
@@ -140,29 +254,78 @@ def update_field_based_on_whether_it_lies(target_fc, mapping_layers, mig_parentt
     target_fc (str): Path to the target feature class.
     value_map (dict): Mapping of join layer keys to values to assign.
     """
-    updated_features = set()  # Set to track updated feature IDs
+    value_by_fid = {}  # TARGET_FID -> value; the first mapping layer a feature intersects wins
+    temp_join = _temp_path("TempJoin")
     for join_fc, value in mapping_layers.items():
-        temp_join = "TempJoin"
-        arcpy.analysis.SpatialJoin(target_features=target_fc,join_features=join_fc,out_feature_class=temp_join,join_operation="JOIN_ONE_TO_ONE", 
-                                   join_type="KEEP_COMMON",field_mapping=None,match_option="INTERSECT",search_radius=None,distance_field_name=None)
-        features_to_update = set()
-        with arcpy.da.SearchCursor(temp_join, ['TARGET_FID']) as cursor:
-            for row in cursor:
-                if row[0] not in updated_features:  
-                    features_to_update.add(row[0])
-        local_count = 0
-        with arcpy.da.UpdateCursor(target_fc, [mig_parenttype, objectid]) as cursor:
-            for row in cursor:
-                if row[1] in features_to_update:
-                    row[0] = value
-                    cursor.updateRow(row) 
-                    updated_features.add(row[1])
-                    local_count += 1
-        #print(f"Updated {local_count} features in '{target_fc}' with the value '{value}' for 'MIG_PARENTTYPE'.")
-        if arcpy.Exists(temp_join):
-            arcpy.management.Delete(temp_join)
-    #total_updated_features = len(updated_features)
-    #print(f"Total updated features in all categories: {total_updated_features}")
+        try:
+            arcpy.analysis.SpatialJoin(target_features=target_fc,join_features=join_fc,out_feature_class=temp_join,join_operation="JOIN_ONE_TO_ONE", 
+                                       join_type="KEEP_COMMON",field_mapping=None,match_option="INTERSECT",search_radius=None,distance_field_name=None)
+            with arcpy.da.SearchCursor(temp_join, ['TARGET_FID']) as cursor:
+                for row in cursor:
+                    value_by_fid.setdefault(row[0], value)
+        finally:
+            _delete_temp(temp_join)
+    with arcpy.da.Editor(_workspace_of(target_fc)), arcpy.da.UpdateCursor(target_fc, [mig_parenttype, objectid]) as cursor:
+        for row in cursor:
+            value = value_by_fid.get(row[1])
+            if value is not None and value != row[0]:
+                row[0] = value
+                cursor.updateRow(row)
+
+
+def _station_relations(target_fc, station_fc, interior_relation, temp_join):
+    """
+    Spatially joins features to the stations they intersect and tests each feature once with a DE-9IM relation against the first of them,
+    in station OID order, as the station-by-station loop did. Returns two dictionaries of feature OID to the GLOBALID of that station:
+    the features that satisfy interior_relation with it, and the features that only intersect it.
+    Parameters:
+    target_fc (str): Path to the point or line feature class.
+    station_fc (str): Path to the station feature class.
+    interior_relation (str): DE-9IM pattern that a feature must match with a station to count as inside, e.g. '**F**F***'.
+                             It must imply that the station covers the feature, which lets a bounding box test reject most pairs.
+    temp_join (str): Path of the temporary join output, deleted before returning.
+    """
+    field_mappings = arcpy.FieldMappings()
+    arcpy.analysis.SpatialJoin(target_features=target_fc, join_features=station_fc, out_feature_class=temp_join, join_operation="JOIN_ONE_TO_MANY",
+                               join_type="KEEP_COMMON", field_mapping=field_mappings, match_option="INTERSECT")
+    try:
+        with arcpy.da.SearchCursor(temp_join, ['TARGET_FID', 'JOIN_FID']) as cursor:
+            pairs = sorted(cursor)
+    finally:
+        _delete_temp(temp_join)
+    with arcpy.da.SearchCursor(station_fc, ['OID@', 'GLOBALID', 'SHAPE@']) as cursor:
+        stations = {row[0]: (row[1], row[2], row[2].extent) for row in cursor}
+    feature_shapes = {}
+    oid_field = arcpy.Describe(target_fc).OIDFieldName
+    for where_clause in _sql_in_clauses(target_fc, oid_field, {pair[0] for pair in pairs}):
+        with arcpy.da.SearchCursor(target_fc, ['OID@', 'SHAPE@'], where_clause) as cursor:
+            feature_shapes.update(cursor)
+    inside_map = {}
+    intersect_map = {}
+    for oid, station_oid in pairs:
+        if oid in inside_map or oid in intersect_map:
+            continue
+        station_gid, station_shape, station_extent = stations[station_oid]
+        feature_shape = feature_shapes[oid]
+        feature_extent = feature_shape.extent
+        # A feature whose bounding box sticks out of the station's cannot lie within it, so the relate call is skipped.
+        fits_extent = (station_extent.XMin <= feature_extent.XMin and feature_extent.XMax <= station_extent.XMax and
+                       station_extent.YMin <= feature_extent.YMin and feature_extent.YMax <= station_extent.YMax)
+        if fits_extent and feature_shape.relate(station_shape, interior_relation):
+            inside_map[oid] = station_gid
+        else:
+            intersect_map[oid] = station_gid
+    return inside_map, intersect_map
+
+
+@functools.lru_cache(maxsize=128)
+def _fc_fields(fc):
+    """
+    Returns the field names of a feature class, cached per path. Call _fc_fields.cache_clear() after changing the schema.
+    Parameters:
+    fc (str): Path to the feature class.
+    """
+    return frozenset(field.name for field in arcpy.ListFields(fc))
 
 
 def update_line_fc_within_station_boundary(line_fc, station_fc, field_name='LINE_STATUS', field_type='TEXT', field_length=15):
@@ -175,39 +338,29 @@ def update_line_fc_within_station_boundary(line_fc, station_fc, field_name='LINE
     field_type (str): The data type of the field, default is 'TEXT'.
     field_length (int): The length of the field if it is a 'TEXT' type, default is 15.
     """
-    fields = [field.name for field in arcpy.ListFields(line_fc)]
     field_added = False
-    if field_name not in fields:
+    if field_name not in _fc_fields(line_fc):
         arcpy.AddField_management(line_fc, field_name, field_type, field_length=field_length)
+        _fc_fields.cache_clear()
         print(f"Field '{field_name}' was added in {line_fc}.")
         field_added = True
     else:
         print(f"Field '{field_name}' already exists in {line_fc}.")
-    station_dict = {row[0]: row[1] for row in arcpy.da.SearchCursor(station_fc, ['GLOBALID', 'SHAPE@'])}
-    with arcpy.da.UpdateCursor(line_fc, ['SHAPE@', 'MIG_STATIONGUID', 'LINE_STATUS']) as cursor:
-        for row in cursor:
-            line_geom = row[0]
-            status_updated = False
-            for station_global_id, station_polygon in station_dict.items():
-                if line_geom.within(station_polygon):
-                    row[1] = station_global_id
-                    row[2] = 'Inside'
-                    cursor.updateRow(row)
-                    status_updated = True
-                    break
-                elif not line_geom.disjoint(station_polygon):
-                    row[1] = station_global_id
-                    row[2] = 'Partly Inside'
-                    cursor.updateRow(row)
-                    status_updated = True
-                    break
-            if not status_updated:
-                row[1] = None
-                row[2] = 'Outside'
-                cursor.updateRow(row)
-    if field_added:
-        arcpy.DeleteField_management(line_fc, field_name)
-        print(f"Field '{field_name}' was deleted from {line_fc}.")
+    try:
+        # **F**F*** on an intersecting pair is 'covered by': a line running along the boundary still counts as inside; every other line that intersects a station is partly inside.
+        inside_map, intersect_map = _station_relations(line_fc, station_fc, "**F**F***", _temp_path("line_station_join"))
+        status_by_oid = {oid: (station_gid, 'Partly Inside') for oid, station_gid in intersect_map.items()}
+        status_by_oid.update((oid, (station_gid, 'Inside')) for oid, station_gid in inside_map.items())
+        with arcpy.da.Editor(_workspace_of(line_fc)), arcpy.da.UpdateCursor(line_fc, ['OID@', 'MIG_STATIONGUID', field_name]) as cursor:
+            for row in cursor:
+                new_values = status_by_oid.get(row[0], (None, 'Outside'))
+                if (row[1], row[2]) != new_values:
+                    cursor.updateRow((row[0],) + new_values)
+    finally:
+        if field_added:
+            arcpy.DeleteField_management(line_fc, field_name)
+            _fc_fields.cache_clear()
+            print(f"Field '{field_name}' was deleted from {line_fc}.")
 
 
 def update_point_fc_within_station_boundary(point_fc, station_fc, field_name='POINT_STATUS', field_type='TEXT', field_length=15):
@@ -220,54 +373,31 @@ def update_point_fc_within_station_boundary(point_fc, station_fc, field_name='PO
     field_type (str): The data type of the field, default is 'TEXT'.
     field_length (int): The length of the field if it is a 'TEXT' type, default is 15.
     """
-    fields = [field.name for field in arcpy.ListFields(point_fc)]
     field_added = False
-    if field_name not in fields:
+    if field_name not in _fc_fields(point_fc):
         arcpy.AddField_management(point_fc, field_name, field_type, field_length=field_length)
+        _fc_fields.cache_clear()
         print(f"Field '{field_name}' was added in {point_fc}.")
         field_added = True
     else:
         print(f"Field '{field_name}' already exists in {point_fc}.")
-    station_dict = {row[0]: row[1] for row in arcpy.da.SearchCursor(station_fc, ['GLOBALID', 'SHAPE@'])}
-    with arcpy.da.UpdateCursor(point_fc, ['SHAPE@', 'MIG_STATIONGUID', 'POINT_STATUS']) as cursor:
-        for row in cursor:
-            point_geom = row[0]
-            status_updated = False
-            for station_global_id, station_polygon in station_dict.items():
-                if point_geom.within(station_polygon):
-                    row[1] = station_global_id
-                    row[2] = 'Inside'
-                    cursor.updateRow(row)
-                    status_updated = True
-                    break
-                elif point_geom.touches(station_polygon):
-                    row[1] = station_global_id
-                    row[2] = 'On Boundary'
-                    cursor.updateRow(row)
-                    status_updated = True
-                    break
-            if not status_updated:
-                row[1] = None
-                row[2] = 'Outside'
-                cursor.updateRow(row)
-    if field_added:
-        arcpy.DeleteField_management(point_fc, field_name)
-        print(f"Field '{field_name}' was deleted from {point_fc}.")
-
+    try:
+        # T******** requires the point in the polygon interior, so the boundary points are the intersecting points that are not inside.
+        inside_map, intersect_map = _station_relations(point_fc, station_fc, "T********", _temp_path("point_station_join"))
+        # Classify all points at once from the station relations; the cursor then only writes the points whose values change.
+        status_by_oid = {oid: (station_gid, 'On Boundary') for oid, station_gid in intersect_map.items()}
+        status_by_oid.update((oid, (station_gid, 'Inside')) for oid, station_gid in inside_map.items())
+        with arcpy.da.Editor(_workspace_of(point_fc)), arcpy.da.UpdateCursor(point_fc, ['OID@', 'MIG_STATIONGUID', field_name]) as cursor:
+            for row in cursor:
+                new_values = status_by_oid.get(row[0], (None, 'Outside'))
+                if (row[1], row[2]) != new_values:
+                    cursor.updateRow((row[0],) + new_values)
+    finally:
+        if field_added:
+            arcpy.DeleteField_management(point_fc, field_name)
+            _fc_fields.cache_clear()
+            print(f"Field '{field_name}' was deleted from {point_fc}.")
 
-def check_relationship(source_fc, global_id_column, global_id_value):
-    """
-    Parameters:
-    Checks if a specific global ID value exists in a specified column of a feature class.
-    source_fc (str): Path to the source feature class to search.
-    global_id_column (str): Name of the column containing the global ID.
-    global_id_value (str): The global ID value to search for.
-    """
-    with arcpy.da.SearchCursor(source_fc, [global_id_column]) as cursor:
-        for row in cursor:
-            if row[0] == global_id_value:
-                return True
-    return False
 
 def update_mig_issource(dest_fc, source_fc=None, global_id_column=None):
     """
@@ -279,174 +409,323 @@ def update_mig_issource(dest_fc, source_fc=None, global_id_column=None):
     global_id_column (str, optional): Name of the column containing the global ID in the source feature class.
     """
     fields = ["SUBSOURCE", "MIG_ISSOURCE", "GLOBALID"]
-    warning_is_printed = False
-    with arcpy.da.UpdateCursor(dest_fc, fields) as cursor:
+    source_global_ids = None   # stays None when the source cannot be read; the rows are then left as they are
+    if source_fc and global_id_column:
+        # The related GLOBALIDs are read once, so each destination row is a set lookup instead of a scan of the source.
+        try:
+            with arcpy.da.SearchCursor(source_fc, [global_id_column]) as cursor:
+                source_global_ids = {row[0] for row in cursor}
+        except Exception as e:
+            logger.warning("Could not check relationships against %s for %s: %s", source_fc, dest_fc, e)
+    with arcpy.da.Editor(_workspace_of(dest_fc)), arcpy.da.UpdateCursor(dest_fc, fields) as cursor:
         for row in cursor:
             subsource = row[0]
             global_id_value = row[2]
             if source_fc and global_id_column:
-                try:
-                    relationship_exists = check_relationship(source_fc, global_id_column, global_id_value)
+                if source_global_ids is not None:
                     if subsource == 1:
                         row[1] = 2
-                    elif relationship_exists:
+                    elif global_id_value in source_global_ids:
                         row[1] = 1
-                    else:
-                        pass
-                except Exception as e:
-                    if not warning_is_printed:
-                        #print(f"Warning: Could not check relationship for GLOBALID {global_id_value} in {dest_fc}. Error: {str(e)}")
-                        warning_is_printed = True
             else:
                 if subsource == 1:
                     row[1] = 2
                 else:
-                    print(f"Processing without relationship check for GLOBALID {global_id_value} in {dest_fc}.")
+                    logger.debug("Processing without relationship check for GLOBALID %s in %s.", global_id_value, dest_fc)
             cursor.updateRow(row)
-    print(f"Completion for {dest_fc}.")
+    logger.info("Completion for %s.", dest_fc)
 
 #print("Update completed successfully.")
 
 
 
+def run_update_tasks(tasks):
+    """
+    Runs a group of update calls one after another. A group is the unit of work handed to a worker process.
+    Parameters:
+    tasks (list of tuples): Each tuple contains an update function and the tuple of its positional arguments.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")   # spawned worker processes do not inherit the logging setup of main()
+    for function, args in tasks:
+        function(*args)
+
+
+def preload_shared_sources(level):
+    """
+    Returns a copy of a level in which update_fc_from_dict calls that share a source (same feature class, key field and source fields)
+    receive one dictionary read here, so the source is scanned once instead of once per call.
+    Parameters:
+    level (list of lists): Task groups accepted by run_update_tasks.
+    """
+    def source_of(function, args):
+        # calls with a source_where_clause read a filtered source and are left as they are
+        if function is update_fc_from_dict and len(args) == 6 and isinstance(args[0], str):
+            return (args[0], args[2], tuple(pair[0] for pair in args[4]))
+        return None
+    source_counts = collections.Counter(source_of(function, args) for tasks in level for function, args in tasks)
+    source_dicts = {source: _build_dict(*source) for source, count in source_counts.items() if source is not None and count > 1}
+    preloaded_level = []
+    for tasks in level:
+        preloaded_tasks = []
+        for function, args in tasks:
+            source = source_of(function, args)
+            if source in source_dicts:
+                args = (source_dicts[source],) + tuple(args[1:])
+            preloaded_tasks.append((function, args))
+        preloaded_level.append(preloaded_tasks)
+    return preloaded_level
+
+
+def run_update_levels(levels, local_tasks=(), max_workers=None):
+    """
+    Runs task groups level by level in worker processes. Groups of the same level write to different feature classes and run in parallel;
+    a level starts only when the previous one has finished. Sources shared by several calls of a level are read once, when the level starts.
+    Parameters:
+    levels (list of lists): Each level is a list of task groups accepted by run_update_tasks.
+    local_tasks (list of tuples): Tasks that must run in this process (e.g. they use map layer names), run while the first level is processed.
+    max_workers (int): Maximum number of worker processes, default is the number of processors.
+    """
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for level_number, level in enumerate(levels):
+            futures = [executor.submit(run_update_tasks, tasks) for tasks in preload_shared_sources(level)]
+            if level_number == 0:
+                run_update_tasks(local_tasks)
+            for future in concurrent.futures.as_completed(futures):
+                future.result()   # re-raises the first error as soon as its group fails
+
+
+@dataclasses.dataclass(frozen=True)
+class Job:
+    """
+    One attribute join of the migration: copies source fields into the target rows whose key matches.
+    Parameters:
+    target (str): Path to the destination feature class.
+    source (str): Path to the source feature class.
+    src_key (str): Key field in the source feature class.
+    tgt_key (str): Key field in the destination feature class.
+    pairs (list of tuples): List of field pairs (source field, destination field).
+    where (str): SQL where clause selecting the destination rows, default is "" (every row).
+    """
+    target: str
+    source: str
+    src_key: str
+    tgt_key: str
+    pairs: list
+    where: str = ""
+
+
+@dataclasses.dataclass(frozen=True)
+class Step:
+    """
+    One update call that is not an attribute join (self, spatial and MIG_ISSOURCE updates), scheduled together with the jobs.
+    Parameters:
+    targets (tuple): Paths to the feature classes the call writes.
+    function (callable): The update function.
+    args (tuple): Positional arguments of the function.
+    reads (tuple): Paths to feature classes the call reads, default is ().
+    before_jobs (bool): Run before the jobs of the same target instead of after them, default is False.
+    local (bool): Run in this process because the call uses map layers of the current project, default is False.
+    """
+    targets: tuple
+    function: object
+    args: tuple
+    reads: tuple = ()
+    before_jobs: bool = False
+    local: bool = False
+
+
+def _new_unit():
+    """
+    Returns an empty unit of work: the feature classes it writes and reads, and its tasks before, of and after the attribute jobs.
+    """
+    return {"writes": set(), "reads": set(), "before": [], "jobs": [], "after": []}
+
+
+def _schedule(jobs, steps):
+    """
+    Groups jobs and steps into units of work and returns the task groups level by level, and the local tasks.
+    The jobs on one target run in one unit, one update_fc_from_dict call each, in the order they are declared. A unit waits for
+    every unit that writes a feature class it reads, and for the units declared before it that write the same feature class,
+    so the units of one level write different feature classes. Local steps run with the first level, so the units that write
+    a feature class they read wait for them instead.
+    Parameters:
+    jobs (list of Job): Attribute joins.
+    steps (list of Step): Other update calls.
+    """
+    local_unit = _new_unit()
+    units = [local_unit]
+    target_units = {}
+    for job in jobs:
+        if job.target not in target_units:
+            target_units[job.target] = _new_unit()
+            units.append(target_units[job.target])
+        unit = target_units[job.target]
+        unit["jobs"].append((update_fc_from_dict, (job.source, job.target, job.src_key, job.tgt_key, job.pairs, job.where)))
+        unit["writes"].add(job.target)
+        unit["reads"].add(job.source)
+    for step in steps:
+        if step.local:
+            unit = local_unit
+        elif len(step.targets) == 1 and step.targets[0] in target_units:
+            unit = target_units[step.targets[0]]
+        else:
+            unit = _new_unit()
+            units.append(unit)
+        unit["before" if step.before_jobs else "after"].append((step.function, step.args))
+        unit["writes"].update(step.targets)
+        unit["reads"].update(step.reads)
+    unit_levels = {0: 0}
+
+    def level_of(position, pending=()):
+        if position not in unit_levels:
+            if position in pending:
+                raise ValueError("The jobs and steps depend on each other in a cycle.")
+            unit = units[position]
+            dependencies = [other for other, other_unit in enumerate(units) if other not in (0, position) and
+                            (other_unit["writes"] & unit["reads"] or (other < position and other_unit["writes"] & unit["writes"]))]
+            if local_unit["reads"] & unit["writes"] or local_unit["writes"] & (unit["reads"] | unit["writes"]):
+                dependencies.append(0)
+            unit_levels[position] = 1 + max((level_of(other, pending + (position,)) for other in dependencies), default=-1)
+        return unit_levels[position]
+    levels = [[] for _ in range(1 + max(level_of(position) for position in range(len(units))))]
+    for position, unit in enumerate(units[1:], start=1):
+        levels[unit_levels[position]].append(unit["before"] + unit["jobs"] + unit["after"])
+    local_tasks = local_unit["before"] + local_unit["after"]
+    return levels, local_tasks
+
+
+def run(jobs, steps=(), max_workers=None):
+    """
+    Runs the migration declared as jobs and steps; the units of a level run in parallel worker processes.
+    Parameters:
+    jobs (list of Job): Attribute joins.
+    steps (list of Step): Other update calls.
+    max_workers (int): Maximum number of worker processes, default is the number of processors.
+    """
+    levels, local_tasks = _schedule(jobs, steps)
+    run_update_levels(levels, local_tasks, max_workers)
+
+
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Attribute joins; run() runs the jobs on one target one after another in a single worker.
+    jobs = []
+    # Other update calls; run() orders them with the jobs by the feature classes they read and write.
+    steps = []
+
 # BAY CLASS calculated by SWITCHINGFACILITY CLASS
     switching_facility_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\SwitchingFacility"
     bay_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\Bay"
     field_pairs_bay = [("STATION_GUID", "MIG_STATIONGUID"), ("OPERATINGVOLTAGE", "MIG_VOLTAGE")]
     where_clause_bay1 = "SWITCHINGFACILITY_GUID IS NOT NULL"
-    update_fc_from_dict(switching_facility_path, bay_path, "GLOBALID", "SWITCHINGFACILITY_GUID", field_pairs_bay, where_clause_bay1)
+    jobs.append(Job(bay_path, switching_facility_path, "GLOBALID", "SWITCHINGFACILITY_GUID", field_pairs_bay, where_clause_bay1))
 
 
 # BAYSCHEME CLASS calculated by BAY CLASS
     bay_scheme_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\BayScheme"
     field_pairs_bayscheme = [("MIG_STATIONGUID", "MIG_STATIONGUID")]
     where_clause_bay_scheme = "BAY_GUID IS NOT NULL"
-    update_fc_from_dict(bay_path, bay_scheme_path, "GLOBALID", "BAY_GUID", field_pairs_bayscheme, where_clause_bay_scheme)
-
+    jobs.append(Job(bay_scheme_path, bay_path, "GLOBALID", "BAY_GUID", field_pairs_bayscheme, where_clause_bay_scheme))
 # BAYSCHEME CLASS inside STATIONSCHEME CLASS
     station_scheme_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\StationScheme"
-    update_fc_within(bay_scheme_path, station_scheme_path)
+    steps.append(Step((bay_scheme_path,), update_fc_within, (bay_scheme_path, station_scheme_path), reads=(station_scheme_path,)))
 
 
 # CIRCUIT_SOURCE CLASS calculated by ITSELF
     circuit_source_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\CircuitSource"
     field_pairs_circuit_source = [('OBJECTID', 'MIG_OID', 'MIG_OID_TEXT'), ('GLOBALID', 'MIG_GLOBALID')]
-    update_fc_self(circuit_source_path, field_pairs_circuit_source)
+    steps.append(Step((circuit_source_path,), update_fc_self, (circuit_source_path, field_pairs_circuit_source)))
 
 
 # CircuitSourceID CLASS calculated by ITSELF
     circuit_source_id_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\CircuitSourceID"
     field_pairs_circuit_source_id = [('OBJECTID', 'MIG_OID', 'MIG_OID_TEXT'), ('GLOBALID', 'MIG_GLOBALID')]
-    update_fc_self(circuit_source_id_path, field_pairs_circuit_source_id)
+    steps.append(Step((circuit_source_id_path,), update_fc_self, (circuit_source_id_path, field_pairs_circuit_source_id)))
 
 
 # Electric_NET_Junctions CLASS calculated by StationBoundary CLASS
     electric_net_junctions_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\Electric_Net_Junctions"
     station_boundary_fc_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\StationBoundary"
-    update_point_fc_within_station_boundary(electric_net_junctions_path, station_boundary_fc_path)
+    steps.append(Step((electric_net_junctions_path,), update_point_fc_within_station_boundary, (electric_net_junctions_path, station_boundary_fc_path),
+                      reads=(station_boundary_fc_path,), local=True))
 
 # Electric_NET_Junctions CLASS whether the junction is on a busbar, internal connecting line or a conductor
     busbar_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\Busbar"
     conductor_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\Conductor"
     internal_connection_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\InternalConnection"
+    voltage_layer_paths = (internal_connection_path, conductor_path, busbar_path)   # the feature classes behind VOLTAGE_LAYERS
     mapping_el_net_junction = {busbar_path: "Busbar", conductor_path: "Conductor", internal_connection_path: "Internal Connection"}
     mig_parenttype = 'MIG_PARENTTYPE'
     objectid = 'OBJECTID'
-    update_field_based_on_whether_it_lies(electric_net_junctions_path, mapping_el_net_junction, mig_parenttype, objectid)
+    steps.append(Step((electric_net_junctions_path,), update_field_based_on_whether_it_lies, (electric_net_junctions_path, mapping_el_net_junction, mig_parenttype, objectid),
+                      reads=tuple(mapping_el_net_junction), local=True))
 
 # Electric_NET_Junctions CLASS Voltage calculated by Busbar/Conductor/InternalConnection CLASSES
-    join_internal = r"D:\UN\set_DB\set_DB.gdb\join_internal_layer"
-    join_conductor = r"D:\UN\set_DB\set_DB.gdb\join_conductor_layer"
-    join_busbar = r"D:\UN\set_DB\set_DB.gdb\join_busbar_layer"
-    update_mig_voltage(join_internal, join_conductor, join_busbar, electric_net_junctions_path)
+    steps.append(Step((electric_net_junctions_path,), update_mig_voltage, (electric_net_junctions_path,), reads=voltage_layer_paths, local=True))
 
 
 # Connector CLASS calculated by StationBoundary CLASS
     connector_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\Connector"
-    update_point_fc_within_station_boundary(connector_path, station_boundary_fc_path)
+    steps.append(Step((connector_path,), update_point_fc_within_station_boundary, (connector_path, station_boundary_fc_path),
+                      reads=(station_boundary_fc_path,), local=True))
   
 # Connector CLASS whether the junction is on a busbar, internal connecting line or a conductor
     mapping_layers_connector = {busbar_path: "Busbar", conductor_path: "Conductor", internal_connection_path: "Internal Connection"}
-    update_field_based_on_whether_it_lies(connector_path, mapping_layers_connector, mig_parenttype, objectid)
+    steps.append(Step((connector_path,), update_field_based_on_whether_it_lies, (connector_path, mapping_layers_connector, mig_parenttype, objectid),
+                      reads=tuple(mapping_layers_connector), local=True))
 
 # Connector CLASS Voltage calculated by Busbar/Conductor/InternalConnection CLASSES
-    update_mig_voltage(join_internal, join_conductor, join_busbar, connector_path)
+    steps.append(Step((connector_path,), update_mig_voltage, (connector_path,), reads=voltage_layer_paths, local=True))
 
 
 # BUSBAR CLASS calculated by SWITCHINGFACILITY CLASS
-    busbar_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\Busbar"
     field_pairs_busbar = [("STATION_GUID", "MIG_STATIONGUID")]
     where_clause_busbar = "SWITCHINGFACILITY_GUID IS NOT NULL"
-    update_fc_from_dict(switching_facility_path, busbar_path, "GLOBALID", "SWITCHINGFACILITY_GUID", field_pairs_busbar, where_clause_busbar)
-
+    jobs.append(Job(busbar_path, switching_facility_path, "GLOBALID", "SWITCHINGFACILITY_GUID", field_pairs_busbar, where_clause_busbar))
 # BUSBAR CLASS inside STATIONSCHEME CLASS
-    station_scheme_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\StationScheme"
-    update_fc_within(busbar_path, station_scheme_path)
+    steps.append(Step((busbar_path,), update_fc_within, (busbar_path, station_scheme_path), reads=(station_scheme_path,)))
 
 
 # CableHead CLASS calculated by StationBoundary
     cablehead_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\CableHead"
-    update_point_fc_within_station_boundary(cablehead_path, station_boundary_fc_path)
-
+    steps.append(Step((cablehead_path,), update_point_fc_within_station_boundary, (cablehead_path, station_boundary_fc_path),
+                      reads=(station_boundary_fc_path,), before_jobs=True))
 # CableHead calculated by CONDUCTOR CLASS
     field_pairs_cable_head = [("OPERATINGVOLTAGE", "MIG_VOLTAGE")]
     where_clause_cable_head = "CONDUCTOR_GUID IS NOT NULL"
-    update_fc_from_dict(conductor_path, cablehead_path, "GLOBALID", "CONDUCTOR_GUID", field_pairs_cable_head,  where_clause_cable_head)
+    jobs.append(Job(cablehead_path, conductor_path, "GLOBALID", "CONDUCTOR_GUID", field_pairs_cable_head, where_clause_cable_head))
 
 
 # CIRCUITBREAKER CLASS calculated by itself (+Circuit_Source CLASS)
     circuit_breaker_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\CircuitBreaker"
-    update_mig_issource(circuit_breaker_path, circuit_source_path)
-
+    steps.append(Step((circuit_breaker_path,), update_mig_issource, (circuit_breaker_path, circuit_source_path), before_jobs=True))
 # CIRCUITBREAKER calculated by CIRCUITSOURCEID CLASS
     field_pairs_circuit_breaker = [("FEEDERID", "MIG_FEEDERID")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source_path, circuit_breaker_path, "MIG_OID",  "OBJECTID",  field_pairs_circuit_breaker, where_clause)
-
+    jobs.append(Job(circuit_breaker_path, circuit_source_path, "MIG_OID", "OBJECTID", field_pairs_circuit_breaker))
 # CIRCUITBREAKER calculated by CIRCUITSOURCEID CLASS
     field_pairs_circuit_breaker2 = [("FEEDERNAME", "MIG_FEEDERNAME")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source_id_path, circuit_breaker_path,
-                        "MIG_OID",  # or SUBSTATIONID
-                        "OBJECTID", field_pairs_circuit_breaker2, where_clause)
-
+    jobs.append(Job(circuit_breaker_path, circuit_source_id_path, "MIG_OID", "OBJECTID", field_pairs_circuit_breaker2))   # "MIG_OID" or SUBSTATIONID
 # CIRCUITBREAKER CLASS calculated by BAY CLASS
     field_pairs_circuit_breaker3 = [("MIG_STATIONGUID", "MIG_STATIONGUID")]
     where_clause_circuit_breaker = "BAY_GUID IS NOT NULL"
-    update_fc_from_dict(bay_path, circuit_breaker_path, "GLOBALID", "BAY_GUID", field_pairs_circuit_breaker3, where_clause_circuit_breaker)
+    jobs.append(Job(circuit_breaker_path, bay_path, "GLOBALID", "BAY_GUID", field_pairs_circuit_breaker3, where_clause_circuit_breaker))
     
 
 # DISCONNECTOR CLASS calculated by itself (+Circuit_Source CLASS)
     disconnector_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\Disconnector"
-    circuit_source_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\CircuitSource"
     global_id_disconnetor = "DISCONNECTOR_GUID"
-    update_mig_issource(disconnector_path, circuit_source_path, global_id_disconnetor)
-
+    steps.append(Step((disconnector_path,), update_mig_issource, (disconnector_path, circuit_source_path, global_id_disconnetor),
+                      reads=(circuit_source_path,), before_jobs=True))
 # DISCONNECTOR CLASS calculated by CIRCUITSOURCE CLASS
-    circuit_source = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\CircuitSource"
     field_pairs_disconnector1 = [("FEEDERID", "MIG_FEEDERID")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source, disconnector_path, "MIG_OID",  "OBJECTID",  field_pairs_disconnector1, where_clause)
-
+    jobs.append(Job(disconnector_path, circuit_source_path, "MIG_OID", "OBJECTID", field_pairs_disconnector1))
 # DISCONNECTOR CLASS calculated by CIRCUITSOURCEID CLASS
-    circuit_source_id = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\CircuitSourceID"
     field_pairs_disconnector2 = [("FEEDERNAME", "MIG_FEEDERNAME")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source_id, disconnector_path,
-                        "MIG_OID",  # or SUBSTATIONID
-                        "OBJECTID", field_pairs_disconnector2, where_clause)
-    
+    jobs.append(Job(disconnector_path, circuit_source_id_path, "MIG_OID", "OBJECTID", field_pairs_disconnector2))   # "MIG_OID" or SUBSTATIONID
 # DISCONNECTOR CLASS calculated by BAY CLASS
-    bay_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\Bay"
     field_pairs_disconnector3 = [("MIG_STATIONGUID", "MIG_STATIONGUID")]
     where_clause_disconnector = "BAY_GUID IS NOT NULL"
-    update_fc_from_dict(bay_path,
-                        disconnector_path,
-                        "GLOBALID",
-                        "BAY_GUID",
-                        field_pairs_disconnector3,
-                        where_clause_disconnector)
+    jobs.append(Job(disconnector_path, bay_path, "GLOBALID", "BAY_GUID", field_pairs_disconnector3, where_clause_disconnector))
     
 
 # FaultIndicator CLASS calculated by CONDUCTOR CLASS
@@ -460,72 +739,47 @@ def main():
 
 # FUSE CLASS calculated by itself (+Circuit_Source CLASS)
     fuse_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\Fuse"
-    circuit_source_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\CircuitSource"
     global_id_fuse = "FUSE_GUID"
-    update_mig_issource(fuse_path, circuit_source_path,global_id_fuse)
-
+    steps.append(Step((fuse_path,), update_mig_issource, (fuse_path, circuit_source_path, global_id_fuse), reads=(circuit_source_path,), before_jobs=True))
 # FUSE CLASS calculated by CIRCUITSOURCE CLASS
-    circuit_source = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\CircuitSource"
     field_pairs_fuse1 = [("FEEDERID", "MIG_FEEDERID")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source, fuse_path,
-                        "MIG_OID", "OBJECTID",  
-                        field_pairs_fuse1, where_clause)
-
+    jobs.append(Job(fuse_path, circuit_source_path, "MIG_OID", "OBJECTID", field_pairs_fuse1))
 # FUSE CLASS calculated by CIRCUITSOURCEID CLASS
-    circuit_source_id = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\CircuitSourceID"
     field_pairs_fuse2 = [("FEEDERNAME", "MIG_FEEDERNAME")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source_id, fuse_path,
-                    "MIG_OID",  # or SUBSTATIONID
-                    "OBJECTID",  field_pairs_fuse2, where_clause)
-
+    jobs.append(Job(fuse_path, circuit_source_id_path, "MIG_OID", "OBJECTID", field_pairs_fuse2))   # "MIG_OID" or SUBSTATIONID
 # FUSE CLASS calculated by BAY CLASS
-    bay_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\Bay"
-    fuse_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\Fuse"
     field_pairs_fuse3 = [("MIG_STATIONGUID", "MIG_STATIONGUID")]
     where_clause_fuse1 = "BAY_GUID IS NOT NULL"
-    update_fc_from_dict(bay_path,
-                        fuse_path,
-                        "GLOBALID",
-                        "BAY_GUID",
-                        field_pairs_fuse3,
-                        where_clause_fuse1)
+    jobs.append(Job(fuse_path, bay_path, "GLOBALID", "BAY_GUID", field_pairs_fuse3, where_clause_fuse1))
 
 
 # INTERNALCONNECTION CLASS calculated by Station
-    internal_connection_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\InternalConnection"
     station_boundary_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\StationBoundary"
-    update_line_fc_within_station_boundary(internal_connection_path, station_boundary_path)
+    steps.append(Step((internal_connection_path,), update_line_fc_within_station_boundary, (internal_connection_path, station_boundary_path),
+                      reads=(station_boundary_path,)))
 
 
 # LOADBREAK_SWITCH CLASS calculated by itself (+Circuit_Source CLASS)
     loadbreak_switch_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\LoadBreakSwitch"
     global_id_load_break = "LOADBREAKSWTICH_GUID"
-    update_mig_issource(loadbreak_switch_path, circuit_source_path, global_id_load_break)
-
+    steps.append(Step((loadbreak_switch_path,), update_mig_issource, (loadbreak_switch_path, circuit_source_path, global_id_load_break),
+                      reads=(circuit_source_path,), before_jobs=True))
 # LOADBREAK_SWITCH CLASS calculated by CIRCUITSOURCE CLASS
     field_pairs_loak_break1 = [("FEEDERID", "MIG_FEEDERID")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source, loadbreak_switch_path, "MIG_OID",  "OBJECTID",  field_pairs_loak_break1, where_clause)
-
+    jobs.append(Job(loadbreak_switch_path, circuit_source_path, "MIG_OID", "OBJECTID", field_pairs_loak_break1))
 # LOADBREAK_SWITCH CLASS calculated by CIRCUITSOURCEID CLASS
     field_pairs_loak_break2 = [("FEEDERNAME", "MIG_FEEDERNAME")]
-    where_clause = ""
-    update_fc_from_dict(circuit_source_id, loadbreak_switch_path,
-                        "MIG_OID",  # or SUBSTATIONID
-                        "OBJECTID", field_pairs_loak_break2, where_clause)
-
+    jobs.append(Job(loadbreak_switch_path, circuit_source_id_path, "MIG_OID", "OBJECTID", field_pairs_loak_break2))   # "MIG_OID" or SUBSTATIONID
 # LOADBREAK_SWITCH CLASS calculated by BAY CLASS
     field_pairs_loak_break3 = [("MIG_STATIONGUID", "MIG_STATIONGUID")]
-    where_clause_circuit_breaker = "BAY_GUID IS NOT NULL"
-    update_fc_from_dict(bay_path,loadbreak_switch_path,
-        "GLOBALID","BAY_GUID",field_pairs_loak_break3, where_clause_circuit_breaker)
+    where_clause_load_break = "BAY_GUID IS NOT NULL"
+    jobs.append(Job(loadbreak_switch_path, bay_path, "GLOBALID", "BAY_GUID", field_pairs_loak_break3, where_clause_load_break))
     
 
 # MEASUREMENTTRANSFORMER CLASS calculated by Station
     measurement_transformer_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\MeasurementTransformer"
-    update_point_fc_within_station_boundary(measurement_transformer_path, station_boundary_path)
+    steps.append(Step((measurement_transformer_path,), update_point_fc_within_station_boundary, (measurement_transformer_path, station_boundary_path),
+                      reads=(station_boundary_path,)))
 
 
 # POLEEQUIPMENT CLASS calculated by POLE CLASS
@@ -533,8 +787,7 @@ def main():
     pole_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\Pole"
     field_pairs_pole = [("NOMINALVOLTAGE", "MIG_VOLTAGE")]
     where_clause_pole_equipment = "POLE_GUID IS NOT NULL"
-    update_fc_from_dict(pole_path,pole_equipment_path,
-                    "GLOBALID","POLE_GUID",field_pairs_pole,where_clause_pole_equipment)
+    jobs.append(Job(pole_equipment_path, pole_path, "GLOBALID", "POLE_GUID", field_pairs_pole, where_clause_pole_equipment))
 
 
 # STATION_EQUIPMENT CLASS calculated by STATION CLASS
@@ -542,41 +795,24 @@ def main():
     station_equipment_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\StationEquipment"
     field_pairs_station = [("OPERATINGVOLTAGE", "MIG_VOLTAGE")]
     where_clause_station_equipment = "STATION_GUID IS NOT NULL"
-    update_fc_from_dict(
-        station_path,
-        station_equipment_path,
-        "GLOBALID",
-        "STATION_GUID",
-        field_pairs_station,
-        where_clause_station_equipment)
+    jobs.append(Job(station_equipment_path, station_path, "GLOBALID", "STATION_GUID", field_pairs_station, where_clause_station_equipment))
 
 
 # TRANSFORMER CLASS calculated by BAY CLASS
     transformer_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\Transformer"
     field_pairs_transformer = [("MIG_STATIONGUID", "MIG_STATIONGUID")]
     where_clause_transformer = "BAY_GUID IS NOT NULL"
-    update_fc_from_dict(
-        bay_path,
-        transformer_path,
-        "GLOBALID",
-        "BAY_GUID",
-        field_pairs_transformer,
-        where_clause_transformer)
+    jobs.append(Job(transformer_path, bay_path, "GLOBALID", "BAY_GUID", field_pairs_transformer, where_clause_transformer))
 
 
 # TRANSFORMER_UNIT CLASS calculated by TRANSFORMER CLASS
     transformer_unit_path = r"D:\UN\set_DB\databases\GISRO_PILOT.gdb\TransformerUnit"
     field_pairs_tran_unit = [("MIG_STATIONGUID", "MIG_STATIONGUID")]
     where_clause_transformer_unit = "TRANSFORMER_GUID IS NOT NULL"
-    update_fc_from_dict(
-        transformer_path,
-        transformer_unit_path,
-        "GLOBALID",
-        "TRANSFORMER_GUID",
-        field_pairs_tran_unit,
-        where_clause_transformer_unit)
+    jobs.append(Job(transformer_unit_path, transformer_path, "GLOBALID", "TRANSFORMER_GUID", field_pairs_tran_unit, where_clause_transformer_unit))
 
+    run(jobs, steps)
     print("Update completed successfully.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
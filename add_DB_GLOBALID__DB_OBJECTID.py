@@ -1,118 +1,301 @@
+import concurrent.futures
+import functools
+import os
+
 import arcpy
 
+try:
+    from osgeo import gdal, ogr
+except ImportError:   # GDAL is optional; without it every update goes through arcpy
+    gdal = ogr = None
+
+EMPTY_VALUES = frozenset([None, '', 0])   # values that do not count as existing data in update_fc_self
+MAX_WORKERS = 4                           # maximum number of geodatabases updated in parallel
+EDIT_BATCH_SIZE = 10000                   # rows calculated per edit operation in update_fc_self
+# field types that can be compared with each other in a where clause
+FIELD_TYPE_GROUPS = {'OID': 'number', 'SmallInteger': 'number', 'Integer': 'number', 'BigInteger': 'number', 'Single': 'number', 'Double': 'number',
+                     'String': 'text', 'GlobalID': 'guid', 'Guid': 'guid'}
+USE_GDAL = False                          # write file geodatabases through GDAL's OpenFileGDB driver instead of arcpy, when available
+
+GDB = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb"
+FIELD_PAIRS = (('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID'))
+# Feature classes whose DB_OBJECTID/DB_GLOBALID are filled from their own OBJECTID/GLOBALID.
+# Bay, BayScheme, Electric_Net_Junctions, StationEquipment and TransformerUnit are currently not updated.
+TARGETS = [os.path.join(GDB, name) for name in ('Busbar', 'CircuitBreaker', 'Disconnector', 'FaultIndicator', 'Fuse', 'InternalConnection',
+                                                'LoadBreakSwitch', 'MeasurementTransformer', 'Transformer')]
+
+
+@functools.lru_cache(maxsize=None)
+def _workspace_of(fc):
+    """
+    Returns the path of the workspace or feature dataset that holds a feature class, cached per path.
+    Parameters:
+    fc (str): Path to the feature class.
+    """
+    return arcpy.Describe(fc).path
+
+
+@functools.lru_cache(maxsize=None)
+def _geodatabase_of(fc):
+    """
+    Returns the geodatabase (or database connection file) that holds a feature class, also when it sits in a feature dataset. Cached per path.
+    Parameters:
+    fc (str): Path to the feature class.
+    """
+    path = _workspace_of(fc)
+    if arcpy.Describe(path).dataType == "FeatureDataset":
+        path = os.path.dirname(path)
+    return path
+
+
+def _changed_rows_clause(source_fc, source_by_target):
+    """
+    Returns a where clause selecting the rows in which at least one target field differs from its source field, so unchanged rows are not written.
+    Returns None when a target and its source have types that cannot be compared in SQL; every row is then written.
+    Parameters:
+    source_fc (str): Path to the feature class.
+    source_by_target (dict): Mapping of target field to the source field copied into it.
+    """
+    field_groups = {field.name: FIELD_TYPE_GROUPS.get(field.type) for field in arcpy.ListFields(source_fc)}
+    conditions = []
+    for target_field, source_field in source_by_target.items():
+        if field_groups.get(target_field) is None or field_groups.get(target_field) != field_groups.get(source_field):
+            return None
+        target = arcpy.AddFieldDelimiters(source_fc, target_field)
+        source = arcpy.AddFieldDelimiters(source_fc, source_field)
+        conditions.append(f"{target} IS NULL OR {target} <> {source}")
+    return " OR ".join(f"({condition})" for condition in conditions)
+
+
+def _sql_updatable(fc):
+    """
+    Returns True for a non-versioned feature class of an enterprise geodatabase, whose base table can be written directly with SQL.
+    Parameters:
+    fc (str): Path to the feature class.
+    """
+    return arcpy.Describe(_geodatabase_of(fc)).workspaceType == "RemoteDatabase" and not arcpy.Describe(fc).isVersioned
+
+
+def _qualified_table_name(fc):
+    """
+    Returns the database- and owner-qualified name of the table of a feature class in an enterprise geodatabase.
+    Parameters:
+    fc (str): Path to the feature class.
+    """
+    parts = arcpy.ParseTableName(arcpy.Describe(fc).name, _geodatabase_of(fc)).split(",")
+    return ".".join(part.strip() for part in parts if part.strip() and part.strip() != "(null)")
+
+
+def _sql_update(connection, source_fc, source_by_target):
+    """
+    Copies the source fields into the target fields with one SQL UPDATE executed by the database.
+    The statement runs in the open transaction of the connection; committing or rolling back is left to the caller.
+    Parameters:
+    connection (arcpy.ArcSDESQLExecute): Connection to the geodatabase of source_fc with a started transaction.
+    source_fc (str): Path to the feature class.
+    source_by_target (dict): Mapping of target field to the source field copied into it.
+    """
+    assignments = ", ".join(f"{arcpy.AddFieldDelimiters(source_fc, target_field)} = {arcpy.AddFieldDelimiters(source_fc, source_field)}"
+                            for target_field, source_field in source_by_target.items())
+    statement = f"UPDATE {_qualified_table_name(source_fc)} SET {assignments}"
+    changed_rows = _changed_rows_clause(source_fc, source_by_target)
+    if changed_rows:
+        statement += f" WHERE {changed_rows}"
+    connection.execute(statement)
+
 
-def update_fc_self(source_fc, field_updates):
+def _oid_batches(source_fc, oid_field, where_clause=None, batch_size=EDIT_BATCH_SIZE):
+    """
+    Yields where clauses that each select the next batch_size rows of a feature class, in OBJECTID order.
+    Parameters:
+    source_fc (str): Path to the feature class.
+    oid_field (str): Name of the OBJECTID field.
+    where_clause (str, optional): SQL where clause limiting the rows that are batched; it is part of every yielded clause.
+    batch_size (int): Number of rows per batch, default is EDIT_BATCH_SIZE.
+    """
+    with arcpy.da.SearchCursor(source_fc, ['OID@'], where_clause, sql_clause=(None, f"ORDER BY {oid_field}")) as cursor:
+        oids = [row[0] for row in cursor]
+    delimited_field = arcpy.AddFieldDelimiters(source_fc, oid_field)
+    for start in range(0, len(oids), batch_size):
+        batch = oids[start:start + batch_size]
+        range_clause = f"{delimited_field} >= {batch[0]} AND {delimited_field} <= {batch[-1]}"
+        yield range_clause if not where_clause else f"({range_clause}) AND ({where_clause})"
+
+
+def update_fc_self(source_fc, field_updates, edit=None, connection=None):
     """
     Updates fields within the same feature class based on a list of field pairs.
     Parameters:
     source_fc (str): Path to the feature class.
     field_updates (list of tuples): Each tuple contains the original field and the new fields to populate.
+    edit (arcpy.da.Editor, optional): Edit session already started on the workspace of source_fc; the update is one operation in it
+                                      and saving is left to the caller. Without it the update opens and saves its own edit session.
+    connection (arcpy.ArcSDESQLExecute, optional): SQL connection with a started transaction; the update is one UPDATE statement in it
+                                                   and committing is left to the caller. Only for feature classes accepted by _sql_updatable.
     """
-    fields = [item for sublist in field_updates for item in sublist]
-    fields_populated = {field: False for field in fields}
-    edit = arcpy.da.Editor(arcpy.Describe(source_fc).path)
-    edit.startEditing(False, True)
-    edit.startOperation()
+    # target field -> source field; a field named in several pairs is read and written once, and the last pair wins as in a row-by-row copy
+    source_by_target = {target_field: source_field for source_field, *update_targets in field_updates for target_field in update_targets}
+    target_fields = list(source_by_target)
+    description = arcpy.Describe(source_fc)
+    # The warning is printed once per field, so the scan stops as soon as every target field has been found to hold data.
+    # Only the target fields are read, in OBJECTID order so the table is scanned sequentially.
+    # Fields that already warned leave pending_warn_targets and their values are not tested again.
+    pending_warn_targets = set(target_fields)
+    with arcpy.da.SearchCursor(source_fc, target_fields, sql_clause=(None, f"ORDER BY {description.OIDFieldName}")) as cursor:
+        for row in cursor:
+            for target_index, target_field in enumerate(target_fields):
+                if target_field in pending_warn_targets and row[target_index] not in EMPTY_VALUES:
+                    print(f"The field '{target_field}' in the feature class {source_fc} already contains data. Any existing data will be overwritten.")
+                    pending_warn_targets.discard(target_field)
+            if not pending_warn_targets:
+                break
+    if connection is not None:
+        _sql_update(connection, source_fc, source_by_target)
+        print("Self-update completed successfully.")
+        return
+    if edit is None and _sql_updatable(source_fc):
+        # SQL outside an edit session; with an edit session the update stays in it so the caller can still discard it.
+        connection = arcpy.ArcSDESQLExecute(_geodatabase_of(source_fc))
+        connection.startTransaction()
+        try:
+            _sql_update(connection, source_fc, source_by_target)
+            connection.commitTransaction()
+        except Exception as e:
+            connection.rollbackTransaction()
+            print(f"Error during update: {e}")
+            raise
+        print("Self-update completed successfully.")
+        return
+    field_expressions = [[target_field, f"!{source_field}!"] for target_field, source_field in source_by_target.items()]
+    # The copies run as calculations inside the geodatabase engine instead of a Python UpdateCursor over every row.
+    # Each batch of EDIT_BATCH_SIZE rows is its own edit operation, so no single operation has to hold the whole table;
+    # rows that already match are skipped, and a table without changed rows makes no batch at all.
+    changed_rows = _changed_rows_clause(source_fc, source_by_target)
+    own_session = edit is None
+    if own_session:
+        edit = arcpy.da.Editor(_geodatabase_of(source_fc))
+        edit.startEditing(False, True)
     try:
-        with arcpy.da.UpdateCursor(source_fc, fields) as cursor:
-            for row in cursor:
-                for update_sub_tuple in field_updates:
-                    source_field = update_sub_tuple[0]
-                    source_index = fields.index(source_field)
-                    source_value = row[source_index]
-                    for each_target_field in update_sub_tuple[1:]:
-                        target_index = fields.index(each_target_field)
-                        if row[target_index] not in [None, '', 0]:
-                            if not fields_populated[each_target_field]:
-                                print(f"The field '{each_target_field}' in the feature class {source_fc} already contains data. Any existing data will be overwritten.")
-                                fields_populated[each_target_field] = True
-                        #if 'TEXT' in each_target_field:
-                            #row[target_index] = str(source_value)
-                        #else:
-                            #row[target_index] = source_value
-                        row[target_index] = source_value
-                cursor.updateRow(row)
-        edit.stopOperation()
-        edit.stopEditing(True)  
+        for where_clause in _oid_batches(source_fc, description.OIDFieldName, changed_rows):
+            edit.startOperation()
+            try:
+                batch_layer = arcpy.management.MakeFeatureLayer(source_fc, "self_update_batch", where_clause)[0]
+                try:
+                    arcpy.management.CalculateFields(batch_layer, "PYTHON3", field_expressions)
+                finally:
+                    arcpy.management.Delete(batch_layer)
+            except Exception:
+                edit.abortOperation()
+                raise
+            edit.stopOperation()
+        if own_session:
+            edit.stopEditing(True)
     except Exception as e:
-        edit.stopOperation()
-        edit.stopEditing(False)
+        if own_session:
+            edit.stopEditing(False)
         print(f"Error during update: {e}")
         raise
     print("Self-update completed successfully.")
 
 
+def _gdal_update_workspace(workspace, jobs):
+    """
+    Copies the fields of all jobs of one file geodatabase through GDAL's OpenFileGDB driver in one dataset-level transaction.
+    Returns False without changing anything when GDAL is not installed or older than 3.7, the workspace is not a file geodatabase,
+    or GDAL cannot open it for writing (e.g. it is locked), so the caller falls back to arcpy.
+    Parameters:
+    workspace (str): Path to the geodatabase that holds the feature classes.
+    jobs (list of tuples): Each tuple contains the path to a feature class and its field pairs for update_fc_self.
+    """
+    if ogr is None or int(gdal.VersionInfo()) < 3070000 or not workspace.lower().endswith(".gdb"):
+        return False
+    with gdal.ExceptionMgr(useExceptions=True):   # raises GDAL errors here without changing the process-wide setting
+        try:
+            dataset = gdal.OpenEx(workspace, gdal.OF_VECTOR | gdal.OF_UPDATE, allowed_drivers=["OpenFileGDB"])
+        except RuntimeError as e:
+            print(f"GDAL could not open {workspace} for writing, arcpy is used instead: {e}")
+            return False
+        dataset.StartTransaction(force=True)   # the driver emulates transactions by backing up the files it modifies
+        try:
+            for fc, field_pairs in jobs:
+                layer = dataset.GetLayerByName(os.path.basename(fc))
+                fid_column = layer.GetFIDColumn()   # OBJECTID is the feature id, not an attribute field, in OGR
+                source_by_target = {target_field: source_field for source_field, *update_targets in field_pairs for target_field in update_targets}
+                # The same once-per-field warning as update_fc_self, checked on the values read before they are overwritten.
+                pending_warn_targets = set(source_by_target)
+                for feature in layer:
+                    for target_field in list(pending_warn_targets):
+                        if feature.GetField(target_field) not in EMPTY_VALUES:
+                            print(f"The field '{target_field}' in the feature class {fc} already contains data. Any existing data will be overwritten.")
+                            pending_warn_targets.discard(target_field)
+                    changed = False
+                    for target_field, source_field in source_by_target.items():
+                        value = feature.GetFID() if source_field == fid_column else feature.GetField(source_field)
+                        if feature.GetField(target_field) != value:
+                            feature.SetField(target_field, value)
+                            changed = True
+                    if changed:
+                        layer.SetFeature(feature)
+            dataset.CommitTransaction()
+        except Exception as e:
+            dataset.RollbackTransaction()
+            print(f"Error during update: {e}")
+            raise
+        finally:
+            dataset = None   # closes the geodatabase
+    for _ in jobs:
+        print("Self-update completed successfully.")
+    return True
+
+
+def update_workspace(workspace, jobs):
+    """
+    Runs update_fc_self for feature classes of one geodatabase so that all updates are saved once at the end, or discarded if any fails:
+    in one database transaction when every feature class can be written with SQL (see _sql_updatable), otherwise in one edit session.
+    Module level so it can run in a worker process.
+    Parameters:
+    workspace (str): Path to the geodatabase that holds the feature classes.
+    jobs (list of tuples): Each tuple contains the path to a feature class and its field pairs for update_fc_self.
+    """
+    if USE_GDAL and _gdal_update_workspace(workspace, jobs):
+        return
+    if all(_sql_updatable(fc) for fc, _ in jobs):
+        connection = arcpy.ArcSDESQLExecute(workspace)
+        connection.startTransaction()
+        try:
+            for fc, field_pairs in jobs:
+                update_fc_self(fc, field_pairs, connection=connection)
+            connection.commitTransaction()
+        except Exception:
+            connection.rollbackTransaction()
+            raise
+        return
+    edit = arcpy.da.Editor(workspace)
+    edit.startEditing(False, True)
+    try:
+        for fc, field_pairs in jobs:
+            update_fc_self(fc, field_pairs, edit)
+        edit.stopEditing(True)
+    except Exception:
+        edit.stopEditing(False)
+        raise
+
+
 def main():
-# BAY CLASS calculated by SWITCHINGFACILITY CLASS
-    bay_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Bay"
-    field_pairs = [('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID')]
-    #######update_fc_self(bay_path, field_pairs)
-
-# BAYSCHEME CLASS calculated by BAY CLASS
-    bay_scheme_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\BayScheme"
-    field_pairs = [('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID')]
-    #######update_fc_self(bay_scheme_path, field_pairs)
-
-# Electric_NET_Junctions CLASS calculated by StationBoundary CLASS
-    electric_net_junctions_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Electric_Net_Junctions"
-    field_pairs = [('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID')]
-    #update_fc_self(electric_net_junctions_path, field_pairs)
-
-# BUSBAR CLASS calculated by SWITCHINGFACILITY CLASS
-    busbar_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Busbar"
-    field_pairs = [('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID')]
-    update_fc_self(busbar_path, field_pairs)
-    
-# CIRCUITBREAKER CLASS calculated by itself (+Circuit_Source CLASS)
-    circuit_breaker_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\CircuitBreaker"
-    field_pairs = [('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID')]
-    update_fc_self(circuit_breaker_path, field_pairs)
-    
-# DISCONNECTOR CLASS calculated by itself (+Circuit_Source CLASS)
-    disconnector_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Disconnector"
-    field_pairs = [('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID')]
-    update_fc_self(disconnector_path, field_pairs)
-    
-# FaultIndicator CLASS calculated by CONDUCTOR CLASS
-    fault_indicator_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\FaultIndicator"
-    field_pairs = [('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID')]
-    update_fc_self(fault_indicator_path, field_pairs)
-    
-# FUSE CLASS calculated by itself (+Circuit_Source CLASS)
-    fuse_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Fuse"
-    field_pairs = [('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID')]
-    update_fc_self(fuse_path, field_pairs)
-    
-# INTERNALCONNECTION CLASS calculated by Station
-    internal_connection_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\InternalConnection"
-    field_pairs = [('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID')]
-    update_fc_self(internal_connection_path, field_pairs)
-
-# LOADBREAK_SWITCH CLASS calculated by itself (+Circuit_Source CLASS)
-    loadbreak_switch_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\LoadBreakSwitch"
-    field_pairs = [('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID')]
-    update_fc_self(loadbreak_switch_path, field_pairs)
-    
-# MEASUREMENTTRANSFORMER CLASS calculated by Station
-    measurement_transformer_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\MeasurementTransformer"
-    field_pairs = [('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID')]
-    update_fc_self(measurement_transformer_path, field_pairs)
-    
-# STATION_EQUIPMENT CLASS calculated by STATION CLASS
-    station_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\StationEquipment"
-    field_pairs = [('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID')]
-    #####update_fc_self(station_path, field_pairs)
-    
-# TRANSFORMER CLASS calculated by BAY CLASS
-    transformer_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\Transformer"
-    field_pairs = [('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID')]
-    update_fc_self(transformer_path, field_pairs)
-    
-# TRANSFORMER_UNIT CLASS calculated by TRANSFORMER CLASS
-    transformer_unit_path = r"D:\UN\set_DB\databases\GISBG_PL_GULY.gdb\TransformerUnit"
-    field_pairs = [('OBJECTID', 'DB_OBJECTID'), ('GLOBALID', 'DB_GLOBALID')]
-    #####update_fc_self(transformer_unit_path, field_pairs)
-    
+    jobs = [(fc, FIELD_PAIRS) for fc in TARGETS]   # (feature class, field pairs) passed to update_fc_self
+    # Feature classes in one geodatabase share an edit session, which also avoids file geodatabase locks between processes;
+    # different geodatabases are updated in parallel worker processes. A single geodatabase is updated in this process.
+    jobs_by_workspace = {}
+    for fc, pairs in jobs:
+        jobs_by_workspace.setdefault(_geodatabase_of(fc), []).append((fc, pairs))
+    if len(jobs_by_workspace) <= 1:
+        for workspace, workspace_jobs in jobs_by_workspace.items():
+            update_workspace(workspace, workspace_jobs)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(MAX_WORKERS, len(jobs_by_workspace))) as executor:
+            futures = [executor.submit(update_workspace, workspace, workspace_jobs) for workspace, workspace_jobs in jobs_by_workspace.items()]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()   # re-raises the first error as soon as its workspace fails
     print("Update completed successfully.")
 
 if __name__ == "__main__":